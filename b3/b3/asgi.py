@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b3.settings")
+os.environ.setdefault("ASYNC_API", "True")
+# Persistent connections would be kept per thread and sync_to_async() uses many
+os.environ.setdefault("DB_POOL", "True")
 
 application = get_asgi_application()
@@ -15,6 +15,7 @@ import os
 import sys
 
 import sentry_sdk
+from corsheaders.defaults import default_headers
 from sentry_sdk.integrations.django import DjangoIntegration
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -42,6 +43,8 @@ CSRF_COOKIE_SAMESITE = "None" if os.getenv("ENV") == "DEV" else "Lax"
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_SAMESITE = "None" if os.getenv("ENV") == "DEV" else "Lax"
 SESSION_COOKIE_HTTPONLY = True
+# Read from Redis, written through to the database
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 CSRF_COOKIE_HTTPONLY = True
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -51,6 +54,7 @@ CORS_ALLOWED_ORIGINS = list(
     filter(None, os.getenv("CORS_ALLOWED_ORIGINS", "").split(","))
 )
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 
 # Application definition
@@ -78,20 +82,51 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "utils.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django_otp.middleware.OTPMiddleware",
+    "users.middleware.AuthenticationMiddleware",
+    "users.middleware.OTPMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "b3.urls"
 
+# Serve the async versions of the task_lists views, set by b3/asgi.py
+ASYNC_API = os.getenv("ASYNC_API") == "True"
+
+# Time-ordered UUIDv7 primary keys for new rows instead of random UUIDv4 ones, see
+# utils.models.uuid7. Rows keep their id, both versions can be mixed.
+UUID7 = os.getenv("UUID7") == "True"
+
+# Seconds between the comments an idle change stream sends so proxies keep it open,
+# see task_lists.changes
+CHANGE_STREAM_HEARTBEAT = int(os.getenv("CHANGE_STREAM_HEARTBEAT", 15))
+
+# Rows deleted per transaction when purging deleted lists and accounts
+DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", 1000))
+
+# Responses smaller than this are sent uncompressed, see utils.middleware
+COMPRESSION_MIN_LENGTH = int(os.getenv("COMPRESSION_MIN_LENGTH", 1024))
+COMPRESSION_GZIP_LEVEL = 6
+# Higher qualities compress a little better but are much slower
+COMPRESSION_BROTLI_QUALITY = 4
+
+# Seconds the responses of requests with an Idempotency-Key are replayed for, see
+# utils.idempotency
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 60 * 60))
+
+# Requests over these are logged as warnings by QueryBudgetMiddleware
+QUERY_BUDGET_MAX_QUERIES = int(os.getenv("QUERY_BUDGET_MAX_QUERIES", 20))
+QUERY_BUDGET_MAX_REPEATS = int(os.getenv("QUERY_BUDGET_MAX_REPEATS", 5))
+QUERY_BUDGET_SERVER_TIMING = os.getenv("QUERY_BUDGET_SERVER_TIMING", "True") == "True"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -116,7 +151,7 @@ WSGI_APPLICATION = "b3.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql"),
+        "ENGINE": os.getenv("DB_ENGINE", "utils.db.postgresql"),
         "NAME": os.getenv("DB_NAME", "b3"),
         "USER": os.getenv("DB_USER", "postgres"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
@@ -128,9 +163,24 @@ DATABASES = {
                 "SSL_ROOT_CERT", "/etc/certs/rds/global-bundle.pem"
             ),
         },
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Either a pool of connections per process, set by b3/asgi.py, or one persistent
+# connection per thread. See "Database connections" in the README for sizing.
+if os.getenv("DB_POOL") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 4)),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 600)),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+DB_POOL_STATS_INTERVAL = int(os.getenv("DB_POOL_STATS_INTERVAL", 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -189,7 +239,13 @@ CACHES = {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/2"),
         "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
-    }
+    },
+    # Per-process cache in front of Redis for hot, rarely changing data. It is not
+    # invalidated across processes so keep timeouts short.
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "b3-local",
+    },
 }
 
 
@@ -204,17 +260,38 @@ SPECTACULAR_SETTINGS = {
 }
 
 
+# orjson renders and parses the same JSON as DRF's classes, only faster
+if os.getenv("ORJSON", "True") == "True":
+    JSON_RENDERER_CLASS = "utils.renderers.ORJSONRenderer"
+    JSON_PARSER_CLASS = "utils.renderers.ORJSONParser"
+else:
+    JSON_RENDERER_CLASS = "rest_framework.renderers.JSONRenderer"
+    JSON_PARSER_CLASS = "rest_framework.parsers.JSONParser"
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_RENDERER_CLASSES": (  # Note that the browsable API is disabled
-        "rest_framework.renderers.JSONRenderer",
+    "DEFAULT_RENDERER_CLASSES": (JSON_RENDERER_CLASS,),  # No browsable API
+    "DEFAULT_PARSER_CLASSES": (
+        JSON_PARSER_CLASS,
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": ("utils.throttling.UserRateThrottle",),
+    # Requests per period, e.g. "10/15m", see utils.throttling
+    "DEFAULT_THROTTLE_RATES": {
+        "user": os.getenv("THROTTLE_USER_RATE", "1200/m"),
+        "login-ip": "10/15m",
+        "login-email": "10/15m",
+        "register-ip": "10/h",
+        "reset-password-ip": "10/h",
+        "reset-password-email": "3/h",
+    },
 }
 
 # 2FA
@@ -255,7 +332,7 @@ if DEBUG:
 
     # Enable browsable API
     REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
-        "rest_framework.renderers.JSONRenderer",
+        JSON_RENDERER_CLASS,
         "utils.renderers.CustomBrowsableAPIRenderer",
     )
 
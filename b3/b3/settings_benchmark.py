@@ -0,0 +1,31 @@
+import os
+
+from .settings import *  # NOQA
+
+# Production settings with Postgres and Redis, but nothing leaves the machine
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver", "localhost", "127.0.0.1"]
+
+DATABASES["default"]["OPTIONS"]["sslmode"] = "disable"  # noqa: F405
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+# Tasks are queued, like in production, but never run
+CELERY_BROKER_URL = "memory://"
+CELERY_BACKEND = "memory"
+
+INSTALLED_APPS.append("benchmarks")  # noqa: F405
+
+# The throttles still run but never kick in
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {  # noqa: F405
+    scope: "1000000/s"
+    for scope in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]  # noqa: F405
+}
+
+# benchmarks.servers reads the query counts from Server-Timing, benchmarks.run
+# collects them itself
+QUERY_BUDGET_SERVER_TIMING = os.getenv("QUERY_BUDGET_SERVER_TIMING") == "True"
+
+# Added to every query to mimic the round trip to a database on another host
+BENCHMARK_DB_LATENCY = float(os.getenv("BENCHMARK_DB_LATENCY_MS", 0)) / 1000
@@ -13,10 +13,12 @@ if "b3.apps.OTPAdminConfig" not in INSTALLED_APPS:  # noqa: F405
 
 
 MIDDLEWARE = [
+    "utils.middleware.QueryBudgetMiddleware",
+    "utils.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django_otp.middleware.OTPMiddleware",
+    "users.middleware.AuthenticationMiddleware",
+    "users.middleware.OTPMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
 ]
 
@@ -41,5 +43,8 @@ CELERY_BACKEND = "memory"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",  # to prevent API throttling
-    }
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
 }
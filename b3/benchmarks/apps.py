@@ -0,0 +1,22 @@
+import time
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+class BenchmarksConfig(AppConfig):
+    name = "benchmarks"
+
+    def ready(self):
+        if settings.BENCHMARK_DB_LATENCY:
+            connection_created.connect(add_latency)
+
+
+def add_latency(sender, connection, **kwargs):
+    connection.execute_wrappers.append(sleep_before_query)
+
+
+def sleep_before_query(execute, sql, params, many, context):
+    time.sleep(settings.BENCHMARK_DB_LATENCY)
+    return execute(sql, params, many, context)
@@ -0,0 +1,240 @@
+"""
+Benchmarks the REST API against a throwaway copy of the database
+
+    python -m benchmarks.run [--concurrency 8] [--requests 200] [--output FILE]
+
+Seeds users, lists and tasks with the test factories, then runs every scenario in
+benchmarks/scenarios.py with concurrent clients going through the whole middleware
+stack, in process. Postgres and Redis are the ones configured in the settings,
+b3.settings_benchmark by default. Results are written as JSON, see `report()`.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=2, help="Untimed requests per client"
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=20, help="Lists per user")
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks per list")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="Only run this scenario, can be repeated",
+    )
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b3.settings_benchmark")
+
+    import django
+
+    django.setup()
+
+    from django.test.utils import setup_databases, teardown_databases
+
+    from .scenarios import SCENARIOS
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        from .seed import seed
+
+        log(f"Seeding {args.users} users x {args.lists} lists x {args.tasks} tasks")
+        dataset = seed(args.users, args.lists, args.tasks)
+
+        results = []
+        for name in names:
+            result = run_scenario(name, SCENARIOS[name], dataset, args)
+            log(
+                f"{name:<24} {result['throughput']:>8.1f} req/s  "
+                f"p50 {result['latency_ms']['p50']:>7.1f} ms  "
+                f"p99 {result['latency_ms']['p99']:>7.1f} ms  "
+                f"{result['queries']['mean']:>5.1f} queries"
+            )
+            results.append(result)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    output = json.dumps(
+        report(results, concurrency=args.concurrency, **dataset_options(args)),
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def run_scenario(name, build_request, dataset, args):
+    from .scenarios import Worker
+
+    workers = [
+        Worker(dataset, dataset.users[i % len(dataset.users)])
+        for i in range(args.concurrency)
+    ]
+    counts = [
+        args.requests // args.concurrency + (i < args.requests % args.concurrency)
+        for i in range(args.concurrency)
+    ]
+    samples = []
+    lock = threading.Lock()
+
+    def work(worker, count):
+        from django.db import connection
+
+        try:
+            for _ in range(args.warmup):
+                send(build_request(worker))
+            worker_samples = [send(build_request(worker)) for _ in range(count)]
+            with lock:
+                samples.extend(worker_samples)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for future in [
+            executor.submit(work, worker, count)
+            for worker, count in zip(workers, counts)
+        ]:
+            future.result()
+    duration = time.perf_counter() - start
+
+    return summarize(name, samples, duration)
+
+
+def send(request):
+    """
+    Returns the latency in seconds, the number of queries and the status code
+    """
+    from django.db import connection
+
+    from utils.middleware import QueryStats
+
+    kwargs = {}
+    if request.method != "get":
+        kwargs["content_type"] = "application/json"
+    stats = QueryStats()
+    with connection.execute_wrapper(stats):
+        start = time.perf_counter()
+        response = getattr(request.client, request.method)(
+            request.path, request.data, headers=request.headers, **kwargs
+        )
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        latency = time.perf_counter() - start
+    return latency, stats.count, response.status_code
+
+
+def summarize(name, samples, duration):
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    queries = [sample[1] for sample in samples]
+    status_codes = {}
+    for sample in samples:
+        status_codes[str(sample[2])] = status_codes.get(str(sample[2]), 0) + 1
+
+    return {
+        "name": name,
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[2] >= 400),
+        "status_codes": status_codes,
+        "duration_s": round(duration, 3),
+        "throughput": round(len(samples) / duration, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "queries": {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries),
+        },
+    }
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of sorted values
+    """
+    rank = max(1, round(percent / 100 * len(values) + 0.5))
+    return values[min(rank, len(values)) - 1]
+
+
+def report(results, **options):
+    """
+    Returns the results with the environment and the options they were measured with
+    """
+    import django
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "settings": os.environ["DJANGO_SETTINGS_MODULE"],
+            **options,
+        },
+        "results": results,
+    }
+
+
+def dataset_options(args):
+    return {
+        "requests": args.requests,
+        "dataset": {
+            "users": args.users,
+            "lists_per_user": args.lists,
+            "tasks_per_list": args.tasks,
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
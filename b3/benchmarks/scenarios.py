@@ -0,0 +1,328 @@
+import datetime
+import random
+from dataclasses import dataclass, field
+
+from django.contrib.auth.tokens import default_token_generator
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from task_lists import models as task_list_models
+
+SCENARIOS = {}
+# Tasks of the list each worker copies, far more than the seeded lists have
+LARGE_LIST_TASKS = 5000
+
+
+@dataclass
+class Request:
+    client: Client
+    method: str
+    path: str
+    data: object = None
+    headers: dict = field(default_factory=dict)
+
+
+class Worker:
+    """
+    One concurrent client, logged in as one of the seeded users
+    """
+
+    def __init__(self, dataset, user):
+        self.dataset = dataset
+        self.user = user
+        self.lists = dataset.lists[user.pk]
+        self.tasks = dataset.tasks[user.pk]
+        self.client = self.logged_in_client(user)
+        self._large_list = None
+
+    def pick_list(self):
+        return random.choice(self.lists)
+
+    def pick_task(self):
+        list_id = self.pick_list()
+        return list_id, random.choice(self.tasks[list_id])
+
+    def large_list(self):
+        """
+        A list of LARGE_LIST_TASKS tasks, created the first time it's needed
+        """
+        if self._large_list is None:
+            self._large_list = task_list_models.List.objects.create(
+                user=self.user, name="large", task_count=LARGE_LIST_TASKS
+            )
+            task_list_models.Task.objects.bulk_create(
+                (
+                    task_list_models.Task(
+                        list=self._large_list, user=self.user, name=str(i)
+                    )
+                    for i in range(LARGE_LIST_TASKS)
+                ),
+                batch_size=1000,
+            )
+        return self._large_list
+
+    def logged_in_client(self, user):
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        return client
+
+    def anonymous_client(self):
+        # A new address per client so the login throttle doesn't kick in
+        return Client(
+            raise_request_exception=False,
+            REMOTE_ADDR=f"10.{random.randrange(256)}.{random.randrange(256)}.1",
+        )
+
+
+def scenario(name):
+    """
+    Registers a function returning the Request to time. Everything the function
+    does itself, like creating rows to delete, is not timed.
+    """
+
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+# task_lists
+
+
+@scenario("list-list")
+def list_lists(worker):
+    return Request(worker.client, "get", reverse("task_list:list-list"))
+
+
+@scenario("list-list-cursor")
+def list_lists_cursor(worker):
+    return Request(worker.client, "get", reverse("task_list:list-list"), {"cursor": ""})
+
+
+@scenario("list-create")
+def create_list(worker):
+    return Request(
+        worker.client,
+        "post",
+        reverse("task_list:list-list"),
+        {"name": worker.dataset.unique("list")},
+    )
+
+
+@scenario("list-detail")
+def retrieve_list(worker):
+    url = reverse("task_list:list-detail", kwargs={"pk": worker.pick_list()})
+    return Request(worker.client, "get", url)
+
+
+@scenario("list-update")
+def update_list(worker):
+    url = reverse("task_list:list-detail", kwargs={"pk": worker.pick_list()})
+    return Request(worker.client, "patch", url, {"name": worker.dataset.unique("list")})
+
+
+@scenario("list-delete")
+def delete_list(worker):
+    list_ = task_list_models.List.objects.create(user=worker.user, name="delete")
+    task_list_models.Task.objects.bulk_create(
+        task_list_models.Task(list=list_, user=worker.user, name=str(i))
+        for i in range(10)
+    )
+    url = reverse("task_list:list-detail", kwargs={"pk": list_.pk})
+    return Request(worker.client, "delete", url)
+
+
+@scenario("list-copy")
+def copy_list(worker):
+    url = reverse("task_list:list-copy", kwargs={"pk": worker.large_list().pk})
+    return Request(worker.client, "post", url)
+
+
+@scenario("task-list")
+def list_tasks(worker):
+    url = reverse("task_list:task-list", kwargs={"pk": worker.pick_list()})
+    return Request(worker.client, "get", url)
+
+
+@scenario("task-list-cursor")
+def list_tasks_cursor(worker):
+    url = reverse("task_list:task-list", kwargs={"pk": worker.pick_list()})
+    return Request(worker.client, "get", url, {"cursor": ""})
+
+
+@scenario("task-create")
+def create_task(worker):
+    url = reverse("task_list:task-list", kwargs={"pk": worker.pick_list()})
+    return Request(worker.client, "post", url, {"name": worker.dataset.unique("task")})
+
+
+@scenario("task-detail")
+def retrieve_task(worker):
+    list_id, task_id = worker.pick_task()
+    url = reverse("task_list:task-detail", kwargs={"pk": list_id, "task_id": task_id})
+    return Request(worker.client, "get", url)
+
+
+@scenario("task-update")
+def update_task(worker):
+    list_id, task_id = worker.pick_task()
+    url = reverse("task_list:task-detail", kwargs={"pk": list_id, "task_id": task_id})
+    return Request(worker.client, "patch", url, {"name": worker.dataset.unique("task")})
+
+
+@scenario("task-delete")
+def delete_task(worker):
+    list_id = worker.pick_list()
+    task = task_list_models.Task.objects.create(
+        list_id=list_id, user=worker.user, name="delete"
+    )
+    task_list_models.List.objects.count_tasks({list_id: 1})
+    url = reverse("task_list:task-detail", kwargs={"pk": list_id, "task_id": task.pk})
+    return Request(worker.client, "delete", url)
+
+
+@scenario("task-bulk-create")
+def bulk_create_tasks(worker):
+    url = reverse("task_list:task-bulk", kwargs={"pk": worker.pick_list()})
+    data = [{"name": worker.dataset.unique("task")} for _ in range(50)]
+    return Request(worker.client, "post", url, data)
+
+
+@scenario("task-bulk-update")
+def bulk_update_tasks(worker):
+    list_id = worker.pick_list()
+    url = reverse("task_list:task-bulk", kwargs={"pk": list_id})
+    data = [
+        {"id": str(task_id), "name": "updated"} for task_id in worker.tasks[list_id]
+    ]
+    return Request(worker.client, "patch", url, data)
+
+
+@scenario("task-bulk-delete")
+def bulk_delete_tasks(worker):
+    list_id = worker.pick_list()
+    tasks = task_list_models.Task.objects.bulk_create(
+        task_list_models.Task(list_id=list_id, user=worker.user, name=str(i))
+        for i in range(50)
+    )
+    task_list_models.List.objects.count_tasks({list_id: len(tasks)})
+    url = reverse("task_list:task-bulk", kwargs={"pk": list_id})
+    return Request(worker.client, "delete", url, {"ids": [str(t.pk) for t in tasks]})
+
+
+@scenario("task-search")
+def search_tasks(worker):
+    # Prefixes of the first names the factories name tasks after
+    q = random.choice(("ann", "mar", "john smi", "eli"))
+    return Request(worker.client, "get", reverse("task_list:task-search"), {"q": q})
+
+
+@scenario("export-ndjson")
+def export_ndjson(worker):
+    return Request(worker.client, "get", reverse("task_list:export"))
+
+
+@scenario("export-csv")
+def export_csv(worker):
+    return Request(
+        worker.client, "get", reverse("task_list:export"), {"file_format": "csv"}
+    )
+
+
+@scenario("sync-full")
+def full_sync(worker):
+    return Request(worker.client, "get", reverse("task_list:sync"))
+
+
+@scenario("sync-delta")
+def delta_sync(worker):
+    since = timezone.now() - datetime.timedelta(minutes=1)
+    return Request(
+        worker.client, "get", reverse("task_list:sync"), {"since": since.isoformat()}
+    )
+
+
+# users
+
+
+@scenario("csrf")
+def csrf(worker):
+    return Request(worker.anonymous_client(), "get", reverse("users:csrf"))
+
+
+@scenario("register")
+def register(worker):
+    data = {
+        "email": f"{worker.dataset.unique('register')}@benchmark.example.com",
+        "password": worker.dataset.password,
+    }
+    return Request(worker.anonymous_client(), "post", reverse("users:register"), data)
+
+
+@scenario("login")
+def login(worker):
+    data = {"email": worker.user.email, "password": worker.dataset.password}
+    return Request(worker.anonymous_client(), "post", reverse("users:login"), data)
+
+
+@scenario("logout")
+def logout(worker):
+    client = worker.logged_in_client(worker.user)
+    return Request(client, "post", reverse("users:logout"))
+
+
+@scenario("user-me")
+def retrieve_me(worker):
+    return Request(worker.client, "get", reverse("users:user-me"))
+
+
+@scenario("user-me-update")
+def update_me(worker):
+    data = {"first_name": worker.dataset.unique("name")}
+    return Request(worker.client, "patch", reverse("users:user-me"), data)
+
+
+@scenario("user-me-delete")
+def delete_me(worker):
+    client = worker.logged_in_client(worker.dataset.create_user())
+    data = {"password": worker.dataset.password}
+    return Request(client, "delete", reverse("users:user-me"), data)
+
+
+@scenario("change-password")
+def change_password(worker):
+    client = worker.logged_in_client(worker.dataset.create_user())
+    data = {
+        "current_password": worker.dataset.password,
+        "new_password": worker.dataset.unique("new-password"),
+    }
+    return Request(client, "put", reverse("users:change-password"), data)
+
+
+@scenario("reset-password")
+def reset_password(worker):
+    data = {"email": worker.user.email}
+    return Request(
+        worker.anonymous_client(), "post", reverse("users:reset-password"), data
+    )
+
+
+@scenario("reset-password-confirm")
+def reset_password_confirm(worker):
+    user = worker.dataset.create_user()
+    url = reverse("users:reset-password-confirm", kwargs={"user_id": user.pk})
+    data = {
+        "password": worker.dataset.unique("new-password"),
+        "token": default_token_generator.make_token(user),
+    }
+    return Request(worker.anonymous_client(), "put", url, data)
+
+
+# versions
+
+
+@scenario("version")
+def version(worker):
+    return Request(worker.anonymous_client(), "get", reverse("versions:version"))
@@ -0,0 +1,82 @@
+import itertools
+from dataclasses import dataclass, field
+
+import factory
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+
+from task_lists import models as task_list_models
+from task_lists.tests import factories as task_list_factories
+from users import models as user_models
+from users.tests import factories as user_factories
+from versions.tests import factories as version_factories
+
+PASSWORD = "benchmark-password-1234"
+
+
+@dataclass
+class Dataset:
+    users: list
+    lists: dict = field(default_factory=dict)
+    tasks: dict = field(default_factory=dict)
+    password: str = PASSWORD
+    password_hash: str = ""
+    sequence: itertools.count = field(default_factory=itertools.count)
+
+    def unique(self, prefix):
+        return f"{prefix}-{next(self.sequence)}"
+
+    def create_user(self):
+        """
+        Creates a user with the benchmark password without hashing it again
+        """
+        return user_models.User.objects.create(
+            email=f"{self.unique('user')}@benchmark.example.com",
+            password=self.password_hash,
+        )
+
+
+def seed(users, lists_per_user, tasks_per_list):
+    """
+    Creates `users` users, each with `lists_per_user` lists of `tasks_per_list` tasks
+
+    Rows are built by the test factories and inserted in bulk. All users share one
+    password hash, hashed once with the configured hasher, so that logins cost what
+    they cost in production while seeding stays fast.
+    """
+    # Only to get past set_password() in UserFactory quickly
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+    ):
+        seeded_users = user_factories.UserFactory.create_batch(
+            users,
+            email=factory.Sequence(lambda n: f"{n:05d}@benchmark.example.com"),
+        )
+    dataset = Dataset(users=seeded_users, password_hash=make_password(PASSWORD))
+    for user in seeded_users:
+        user.password = dataset.password_hash
+    user_models.User.objects.bulk_update(seeded_users, fields=("password",))
+
+    for user in seeded_users:
+        lists = task_list_models.List.objects.bulk_create(
+            task_list_factories.ListFactory.build_batch(
+                lists_per_user, user=user, task_count=tasks_per_list
+            )
+        )
+        tasks = task_list_models.Task.objects.bulk_create(
+            [
+                task
+                for list_ in lists
+                for task in task_list_factories.TaskFactory.build_batch(
+                    tasks_per_list, list=list_
+                )
+            ],
+            batch_size=1000,
+        )
+        dataset.lists[user.pk] = [list_.pk for list_ in lists]
+        dataset.tasks[user.pk] = {}
+        for task in tasks:
+            dataset.tasks[user.pk].setdefault(task.list_id, []).append(task.pk)
+
+    version_factories.VersionFactory(minimum_version="1.0.0")
+    return dataset
@@ -0,0 +1,132 @@
+"""
+Microbenchmarks rendering a page of rows with the serializers and with their
+ValuesPlan, to JSON with DRF's renderer and orjson's, and parsing it back
+
+    python -m benchmarks.serialization [--rows 100] [--repeat 200] [--output FILE]
+
+No database is needed: the model instances and `.values()` rows are built in
+memory, so only the time spent turning rows into JSON is compared.
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import statistics
+import time
+import uuid
+
+from .run import log, report
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b3.settings_benchmark")
+
+    import django
+
+    django.setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from task_lists import models, serializers
+    from utils.renderers import ORJSONParser, ORJSONRenderer
+    from utils.serializers import get_values_plan
+
+    renderer = JSONRenderer()
+    orjson_renderer = ORJSONRenderer()
+    cases = {
+        "lists": (serializers.ListSerializer, models.List),
+        "tasks": (serializers.TaskCreateSerializer, models.Task),
+    }
+
+    results = []
+    for name, (serializer_class, model) in cases.items():
+        plan = get_values_plan(serializer_class)
+        rows = build_rows(model, args.rows)
+        instances = [model(**row) for row in rows]
+
+        def serializer():
+            return renderer.render(serializer_class(instances, many=True).data)
+
+        def values_plan():
+            return renderer.render(plan.render(rows))
+
+        def values_orjson():
+            return orjson_renderer.render(plan.render(rows))
+
+        body = serializer()
+        assert body == values_plan() == values_orjson()
+        data = plan.render(rows)
+        paths = {
+            "serializer": serializer,
+            "values": values_plan,
+            "values+orjson": values_orjson,
+            "render": lambda: renderer.render(data),
+            "render+orjson": lambda: orjson_renderer.render(data),
+            "parse": lambda: JSONParser().parse(io.BytesIO(body)),
+            "parse+orjson": lambda: ORJSONParser().parse(io.BytesIO(body)),
+        }
+        for path, render in paths.items():
+            result = measure(f"{name}:{path}", render, args.repeat)
+            log(f"{result['name']:<20} {result['per_page_us']['p50']:>10.1f} us/page")
+            results.append(result)
+
+    output = json.dumps(report(results, rows=args.rows), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def build_rows(model, count):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    list_id = uuid.uuid4()
+    rows = []
+    for i in range(count):
+        row = {
+            "id": uuid.uuid4(),
+            "name": f"Row {i}",
+            "created_at": now,
+            "updated_at": now,
+        }
+        if model._meta.model_name == "task":
+            row.update(list_id=list_id, description=f"Description of row {i}")
+        else:
+            row.update(task_count=i)
+        rows.append(row)
+    return rows
+
+
+def measure(name, render, repeat):
+    for _ in range(10):
+        render()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return {
+        "name": name,
+        "repeat": repeat,
+        "per_page_us": {
+            "mean": round(statistics.fmean(timings), 1),
+            "p50": round(statistics.median(timings), 1),
+            "min": round(min(timings), 1),
+        },
+    }
+
+
+if __name__ == "__main__":
+    main()
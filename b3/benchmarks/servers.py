@@ -0,0 +1,297 @@
+"""
+Benchmarks the read endpoints served over HTTP by uWSGI and by uvicorn
+
+    python -m benchmarks.servers [--server uwsgi] [--concurrency 64] [--output FILE]
+
+Seeds a throwaway copy of the database like benchmarks.run, then starts each server
+on it, the same number of worker processes each: uWSGI with the WSGI application
+and the sync views as deployed by uwsgi.ini, uvicorn with the ASGI application and
+the async views. Every concurrent client keeps its own HTTP/1.1 connection, so many
+requests wait on the database at once. Use --db-latency to add a round trip to every
+query, as with a database on another host, where the async views should pull ahead.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import time
+
+from .run import log, summarize
+
+SCENARIOS = ["list-list", "list-detail", "task-list", "task-detail"]
+SERVERS = {
+    "uwsgi": lambda port, workers: [
+        "uwsgi",
+        "--master",
+        "--http",
+        f"127.0.0.1:{port}",
+        "--http-keepalive",
+        "--module",
+        "b3.wsgi:application",
+        "--processes",
+        str(workers),
+        "--enable-threads",
+        "--thunder-lock",
+        "--buffer-size",
+        "32768",
+        "--die-on-term",
+        "--disable-logging",
+    ],
+    "uvicorn": lambda port, workers: [
+        "uvicorn",
+        "b3.asgi:application",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--no-access-log",
+    ],
+}
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--server", action="append", dest="servers", choices=list(SERVERS)
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Processes per server")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="Requests per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=2, help="Untimed requests per client"
+    )
+    parser.add_argument(
+        "--db-latency", type=float, default=0, help="Milliseconds added to queries"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=20, help="Lists per user")
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks per list")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        choices=SCENARIOS,
+        help="Only run this scenario, can be repeated",
+    )
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import json
+
+    args = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b3.settings_benchmark")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_databases, teardown_databases
+
+    from .run import dataset_options, report
+    from .scenarios import SCENARIOS as BUILDERS
+    from .scenarios import Worker
+    from .seed import seed
+
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        log(f"Seeding {args.users} users x {args.lists} lists x {args.tasks} tasks")
+        dataset = seed(args.users, args.lists, args.tasks)
+        workers = [
+            Worker(dataset, dataset.users[i % len(dataset.users)])
+            for i in range(args.concurrency)
+        ]
+        # The servers connect to the test database the data was seeded in
+        database = connection.settings_dict["NAME"]
+        connection.close()
+
+        results = []
+        for server in args.servers or list(SERVERS):
+            with serve(server, database, args):
+                for name in args.scenarios or SCENARIOS:
+                    result = run_scenario(
+                        f"{server}:{name}", BUILDERS[name], workers, args
+                    )
+                    log(
+                        f"{result['name']:<24} {result['throughput']:>8.1f} req/s  "
+                        f"p50 {result['latency_ms']['p50']:>7.1f} ms  "
+                        f"p99 {result['latency_ms']['p99']:>7.1f} ms"
+                    )
+                    results.append(result)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    output = json.dumps(
+        report(
+            results,
+            concurrency=args.concurrency,
+            workers=args.workers,
+            db_latency_ms=args.db_latency,
+            **dataset_options(args),
+        ),
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+class serve:
+    """
+    Runs the server in a subprocess until the block exits
+    """
+
+    def __init__(self, server, database, args):
+        self.command = SERVERS[server](args.port, args.workers)
+        self.port = args.port
+        self.env = {
+            **os.environ,
+            "DB_NAME": database,
+            "ASYNC_API": str(server == "uvicorn"),
+            "QUERY_BUDGET_SERVER_TIMING": "True",
+            "BENCHMARK_DB_LATENCY_MS": str(args.db_latency),
+        }
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while not asyncio.run(self.is_up()):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.process.kill()
+                sys.exit(f"{' '.join(self.command)} didn't start")
+            time.sleep(0.2)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    async def is_up(self):
+        try:
+            connection = await Connection.open("127.0.0.1", self.port)
+        except OSError:
+            return False
+        await connection.close()
+        return True
+
+
+def run_scenario(name, build_request, workers, args):
+    from django.conf import settings
+    from django.db import connection
+
+    def build(worker, count):
+        cookie = worker.client.cookies[settings.SESSION_COOKIE_NAME].value
+        requests = []
+        for _ in range(count):
+            request = build_request(worker)
+            headers = {
+                "Cookie": f"{settings.SESSION_COOKIE_NAME}={cookie}",
+                **request.headers,
+            }
+            requests.append((request.path, headers))
+        return requests
+
+    counts = [
+        args.requests // len(workers) + (i < args.requests % len(workers))
+        for i in range(len(workers))
+    ]
+    plans = [
+        build(worker, args.warmup + count) for worker, count in zip(workers, counts)
+    ]
+    connection.close()
+
+    async def work(requests):
+        client = await Connection.open("127.0.0.1", args.port)
+        try:
+            warmup = args.warmup
+            for path, headers in requests[:warmup]:
+                await client.get(path, headers)
+            return [
+                await client.get(path, headers) for path, headers in requests[warmup:]
+            ]
+        finally:
+            await client.close()
+
+    async def measure():
+        start = time.perf_counter()
+        samples = await asyncio.gather(*(work(requests) for requests in plans))
+        return samples, time.perf_counter() - start
+
+    samples, duration = asyncio.run(measure())
+    return summarize(name, [sample for group in samples for sample in group], duration)
+
+
+class Connection:
+    """
+    Minimal keep-alive HTTP/1.1 client, enough for JSON GET requests
+    """
+
+    def __init__(self, host, reader, writer):
+        self.host = host
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(f"{host}:{port}", reader, writer)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def get(self, path, headers):
+        """
+        Returns the latency in seconds, the number of queries and the status code
+        """
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        start = time.perf_counter()
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        response_headers = {}
+        for line in filter(None, header_lines):
+            key, _, value = line.partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+        if "content-length" in response_headers:
+            await self.reader.readexactly(int(response_headers["content-length"]))
+        elif response_headers.get("transfer-encoding") == "chunked":
+            await self.read_chunks()
+        latency = time.perf_counter() - start
+
+        match = QUERIES_PATTERN.search(response_headers.get("server-timing", ""))
+        return latency, int(match[1]) if match else 0, int(status_line.split()[1])
+
+    async def read_chunks(self):
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await self.reader.readexactly(size + 2)
+            if size == 0:
+                return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compares inserting rows keyed by random UUIDv4 and by time-ordered UUIDv7 ids
+
+    python -m benchmarks.uuid_keys [--rows 10000000] [--batch 100000] [--output FILE]
+
+Each version fills its own table, keyed like the UUIDModel tables, in a throwaway
+database, in batches copied in one transaction each. The ids are made beforehand
+by utils.models like the app makes them, so only the time Postgres spends is
+measured. Reported per version: insert throughput, overall and over the last
+tenth of the rows when the index is largest, the size of the table and of its
+primary key index, the WAL written and, with the pgstattuple extension, how full
+the index's leaf pages are.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+
+from .run import log, report
+
+PAYLOAD = "x" * 64
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=100_000, help="Rows per COPY")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b3.settings_benchmark")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_databases, teardown_databases
+
+    from utils.models import uuid7
+
+    versions = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        with connection.cursor() as cursor:
+            has_pgstattuple = create_pgstattuple(cursor)
+            results = []
+            for name, new_uuid in versions.items():
+                log(f"Inserting {args.rows} rows keyed by {name}")
+                result = measure(cursor, name, new_uuid, args, has_pgstattuple)
+                log(
+                    f"{name:<6} {result['rows_per_s']:>10.0f} rows/s  "
+                    f"last tenth {result['last_tenth_rows_per_s']:>10.0f} rows/s  "
+                    f"index {result['index_bytes'] / 2**20:>8.1f} MiB  "
+                    f"WAL {result['wal_bytes'] / 2**20:>8.1f} MiB"
+                )
+                results.append(result)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    output = json.dumps(report(results, rows=args.rows, batch=args.batch), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def create_pgstattuple(cursor):
+    from django.db import DatabaseError, transaction
+
+    try:
+        with transaction.atomic():
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pgstattuple")
+    except DatabaseError:
+        log("pgstattuple isn't available, leaf density won't be reported")
+        return False
+    return True
+
+
+def measure(cursor, name, new_uuid, args, has_pgstattuple):
+    from django.db import transaction
+
+    table = f"benchmark_{name}"
+    cursor.execute(f"CREATE TABLE {table} (id uuid PRIMARY KEY, payload text)")
+    cursor.execute("CHECKPOINT")
+    cursor.execute("SELECT pg_current_wal_lsn()")
+    (wal_start,) = cursor.fetchone()
+
+    rates = []
+    inserted = 0
+    duration = 0.0
+    while inserted < args.rows:
+        count = min(args.batch, args.rows - inserted)
+        rows = [(new_uuid(), PAYLOAD) for _ in range(count)]
+        start = time.perf_counter()
+        with transaction.atomic():
+            with cursor.cursor.copy(f"COPY {table} (id, payload) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        elapsed = time.perf_counter() - start
+        duration += elapsed
+        inserted += count
+        rates.append((inserted, count / elapsed))
+
+    cursor.execute(
+        "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s), "
+        "pg_relation_size(%s), pg_relation_size(%s)",
+        [wal_start, table, f"{table}_pkey"],
+    )
+    wal_bytes, table_bytes, index_bytes = cursor.fetchone()
+    leaf_density = None
+    if has_pgstattuple:
+        cursor.execute(
+            "SELECT avg_leaf_density FROM pgstatindex(%s)", [f"{table}_pkey"]
+        )
+        (leaf_density,) = cursor.fetchone()
+    cursor.execute(f"DROP TABLE {table}")
+
+    last_tenth = [rate for position, rate in rates if position > args.rows * 0.9]
+    return {
+        "name": name,
+        "rows": inserted,
+        "duration_s": round(duration, 3),
+        "rows_per_s": round(inserted / duration),
+        "last_tenth_rows_per_s": round(statistics.fmean(last_tenth)),
+        "table_bytes": table_bytes,
+        "index_bytes": index_bytes,
+        "wal_bytes": int(wal_bytes),
+        "index_leaf_density": leaf_density,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from utils.async_views import AsyncGenericAPIView
+from utils.pagination import OptionalKeysetPagination
+
+from . import changes, exports, models, serializers, tasks
+from .views import ExportMixin
+
+
+class AsyncListOwnerMixin:
+    async def acheck_list_owner(self):
+        is_list_owner = await models.List.objects.filter(
+            pk=self.kwargs["pk"],
+            user=self.user,
+        ).aexists()
+        if not is_list_owner:
+            raise Http404
+
+
+class ListView(AsyncGenericAPIView):
+    """
+    Async ListViewSet list and create
+    """
+
+    serializer_class = serializers.ListSerializer
+    pagination_class = OptionalKeysetPagination
+
+    def get_queryset(self):
+        return models.List.objects.filter(user=self.user).order_by("-created_at", "-id")
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist()
+
+    async def post(self, request, *args, **kwargs):
+        return await self.aidempotent(lambda: self.acreate(user=self.user))
+
+
+class ListDetailView(AsyncGenericAPIView):
+    """
+    Async ListViewSet retrieve, update and destroy
+    """
+
+    serializer_class = serializers.ListSerializer
+
+    def get_queryset(self):
+        return models.List.objects.filter(user=self.user)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve()
+
+    async def put(self, request, *args, **kwargs):
+        return await self.aupdate()
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.aupdate(partial=True)
+
+    async def delete(self, request, *args, **kwargs):
+        return await self.adestroy()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        models.Tombstone.objects.record(
+            self.user, models.Tombstone.ObjectType.LIST, [instance.pk]
+        )
+        tasks.delete_list(instance)
+
+
+class TaskView(AsyncListOwnerMixin, AsyncGenericAPIView):
+    """
+    Async TaskView
+    """
+
+    serializer_class = serializers.TaskCreateSerializer
+    pagination_class = OptionalKeysetPagination
+
+    def get_serializer_context(self):
+        return {
+            "list_id": self.kwargs["pk"],
+            **super().get_serializer_context(),
+        }
+
+    def get_queryset(self):
+        return (
+            models.Task.objects.of_user(self.user)
+            .filter(list=self.kwargs["pk"])
+            .order_by("-created_at", "-id")
+        )
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist()
+
+    async def post(self, request, *args, **kwargs):
+        return await self.aidempotent(self.acreate_task)
+
+    async def acreate_task(self):
+        serializer = await self.avalidate(self.get_serializer(data=self.request.data))
+        await self.acheck_list_owner()
+        await sync_to_async(self.perform_create)(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        """
+        Runs in a thread so the task and the list's task_count are written in one
+        transaction
+        """
+        serializer.instance = models.Task.objects.create(
+            **serializer.validated_data, list_id=self.kwargs["pk"], user=self.user
+        )
+        models.List.objects.count_tasks({self.kwargs["pk"]: 1})
+
+
+class TaskDetailView(AsyncGenericAPIView):
+    """
+    Async TaskDetailView
+    """
+
+    serializer_class = serializers.TaskSerializer
+    lookup_url_kwarg = "task_id"
+
+    def get_serializer_context(self):
+        return {
+            "list_id": self.kwargs["pk"],
+            **super().get_serializer_context(),
+        }
+
+    def get_queryset(self):
+        return models.Task.objects.of_user(self.user)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve()
+
+    async def put(self, request, *args, **kwargs):
+        return await self.aupdate(list_id=self.kwargs["pk"])
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.aupdate(partial=True, list_id=self.kwargs["pk"])
+
+    async def delete(self, request, *args, **kwargs):
+        return await self.adestroy()
+
+    async def asave(self, serializer, **kwargs):
+        if serializer.instance.list_id == kwargs["list_id"]:
+            return await super().asave(serializer, **kwargs)
+        return await sync_to_async(self.perform_move)(serializer, **kwargs)
+
+    def perform_update(self, serializer, **kwargs):
+        if serializer.instance.list_id == kwargs["list_id"]:
+            return super().perform_update(serializer, **kwargs)
+        return self.perform_move(serializer, **kwargs)
+
+    @transaction.atomic
+    def perform_move(self, serializer, **kwargs):
+        """
+        Runs in a thread so the task and the task_count of both lists are written in
+        one transaction
+        """
+        instance = serializer.instance
+        locked = (
+            self.get_queryset()
+            .select_for_update(of=("self",))
+            .filter(pk=instance.pk)
+            .first()
+        )
+        if locked is None:
+            raise Http404
+        serializer.update(instance, {**serializer.validated_data, **kwargs})
+        if locked.list_id != instance.list_id:
+            models.List.objects.count_tasks({locked.list_id: -1, instance.list_id: 1})
+        return instance
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        models.Tombstone.objects.record(
+            self.user, models.Tombstone.ObjectType.TASK, [instance.pk]
+        )
+        deleted, _ = instance.delete()
+        models.List.objects.count_tasks({instance.list_id: -deleted})
+
+
+class ExportView(ExportMixin, AsyncGenericAPIView):
+    """
+    Async ExportView
+
+    Its async iterator is streamed as the rows are read, a sync one would be read
+    to the end by the ASGI handler before the first byte is sent.
+    """
+
+    file_formats = {
+        "ndjson": (exports.ato_ndjson, "application/x-ndjson"),
+        "csv": (exports.ato_csv, "text/csv"),
+    }
+
+    async def get(self, request, *args, **kwargs):
+        return self.get_export_response(self.request)
+
+
+class ChangeStreamView(AsyncGenericAPIView):
+    """
+    Streams a `change` server-sent event when the user's lists or tasks change,
+    with the types changed, e.g. `{"changed": ["list", "task"]}`, to run a sync on
+
+    The first event comes once the stream is subscribed, so changes made while the
+    client wasn't connected are picked up by that sync.
+    """
+
+    # Milliseconds EventSource waits before reconnecting
+    retry = 5000
+
+    async def get(self, request, *args, **kwargs):
+        await sync_to_async(self.release_connections)()
+        response = StreamingHttpResponse(
+            self.events(), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stops nginx from buffering the events
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def release_connections(self):
+        """
+        Closes, or gives back to the pool, the connections authentication used, as
+        the stream keeps the request open for as long as the client is connected
+        """
+        for connection in connections.all(initialized_only=True):
+            if not connection.in_atomic_block:
+                connection.close()
+
+    async def events(self):
+        yield f"retry: {self.retry}\n\n"
+        async with changes.feed.subscribe(self.user.pk) as subscription:
+            while True:
+                try:
+                    changed = await asyncio.wait_for(
+                        subscription.get(), settings.CHANGE_STREAM_HEARTBEAT
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps({"changed": sorted(changed)})
+                yield f"event: change\ndata: {data}\n\n"
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import json
+import logging
+
+import psycopg
+from django.db import connections
+
+from .models import Tombstone
+
+logger = logging.getLogger(__name__)
+
+# Notified by the triggers of migration 0013 for every statement writing lists or
+# tasks, with the user and the type of what changed
+CHANNEL = "task_lists_change"
+OBJECT_TYPES = frozenset(Tombstone.ObjectType.values)
+# Seconds between reconnection attempts, doubling up to the maximum
+RECONNECT_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+
+
+class Subscription:
+    """
+    The types of objects changed for a user since the subscriber last got them
+
+    Changes coalesce until the subscriber gets them, so a slow client never holds
+    more than the set of types.
+    """
+
+    def __init__(self):
+        self.changed = set()
+        self.event = asyncio.Event()
+
+    def push(self, object_types):
+        self.changed.update(object_types)
+        self.event.set()
+
+    async def get(self):
+        await self.event.wait()
+        self.event.clear()
+        changed, self.changed = self.changed, set()
+        return changed
+
+
+class ChangeFeed:
+    """
+    Fans the changes Postgres notifies on CHANNEL out to the subscribers of this
+    process
+
+    A single connection listens for the whole process, from the first subscription
+    until the last one ends. Notifications sent while it wasn't listening are lost,
+    so every subscriber gets all types as changed whenever it starts listening,
+    which also tells new subscribers when to run their first sync.
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self.subscriptions = {}
+        self.listener = None
+        self.listening = False
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, user_id):
+        subscription = Subscription()
+        self.subscriptions.setdefault(str(user_id), set()).add(subscription)
+        if self.listening:
+            subscription.push(OBJECT_TYPES)
+        if self.listener is None:
+            self.listener = asyncio.create_task(self.listen())
+        try:
+            yield subscription
+        finally:
+            subscriptions = self.subscriptions[str(user_id)]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[str(user_id)]
+            if not self.subscriptions:
+                await self.stop()
+
+    async def stop(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await listener
+
+    async def listen(self):
+        delay = RECONNECT_DELAY
+        try:
+            while True:
+                try:
+                    async with await self.connect() as connection:
+                        await connection.execute(f"LISTEN {CHANNEL}")
+                        self.listening = True
+                        delay = RECONNECT_DELAY
+                        for subscriptions in self.subscriptions.values():
+                            for subscription in subscriptions:
+                                subscription.push(OBJECT_TYPES)
+                        async for notify in connection.notifies():
+                            try:
+                                self.dispatch(notify.payload)
+                            except Exception:
+                                logger.exception(
+                                    "Dispatching the change %r failed", notify.payload
+                                )
+                except psycopg.Error:
+                    logger.warning(
+                        "Listening for changes failed, retrying in %ss",
+                        delay,
+                        exc_info=True,
+                    )
+                finally:
+                    self.listening = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        except Exception:
+            logger.exception("Listening for changes stopped")
+        finally:
+            # So the next subscription starts a new listener
+            if self.listener is asyncio.current_task():
+                self.listener = None
+
+    async def connect(self):
+        # Not one of Django's connections, which are sync and may be pooled
+        params = connections[self.alias].get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        return await psycopg.AsyncConnection.connect(**params, autocommit=True)
+
+    def dispatch(self, payload):
+        change = json.loads(payload)
+        for subscription in self.subscriptions.get(change["user_id"], ()):
+            subscription.push((change["type"],))
+
+
+feed = ChangeFeed()
@@ -0,0 +1,138 @@
+import csv
+import datetime
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import models
+
+# Rows fetched per round trip from the server-side cursor
+CURSOR_CHUNK_SIZE = 2000
+# Encoded rows joined into each chunk of the response
+ROWS_PER_CHUNK = 500
+
+COLUMNS = ("type", "id", "list_id", "name", "description", "created_at", "updated_at")
+LIST_COLUMNS = ("id", "name", "created_at", "updated_at")
+TASK_COLUMNS = ("id", "list_id", "name", "description", "created_at", "updated_at")
+
+
+class _Echo:
+    """Pseudo buffer that hands back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _querysets(user):
+    lists = models.List.objects.filter(user=user)
+    # The tasks of lists being deleted are left out with them
+    tasks = models.Task.objects.of_user(user)
+    return lists.values(*LIST_COLUMNS), tasks.values(*TASK_COLUMNS)
+
+
+def iter_rows(user):
+    lists, tasks = _querysets(user)
+    for row in lists.iterator(chunk_size=CURSOR_CHUNK_SIZE):
+        yield "list", row
+    for row in tasks.iterator(chunk_size=CURSOR_CHUNK_SIZE):
+        yield "task", row
+
+
+async def aiter_rows(user):
+    """
+    iter_rows() for the async views, which the ASGI handler streams as they go
+    instead of reading a sync iterator to the end first
+    """
+    lists, tasks = _querysets(user)
+    async for row in lists.aiterator(chunk_size=CURSOR_CHUNK_SIZE):
+        yield "list", row
+    async for row in tasks.aiterator(chunk_size=CURSOR_CHUNK_SIZE):
+        yield "task", row
+
+
+def to_ndjson(user):
+    encode = _ndjson_encoder()
+    return _chunked(encode(kind, row) for kind, row in iter_rows(user))
+
+
+def ato_ndjson(user):
+    encode = _ndjson_encoder()
+
+    async def lines():
+        async for kind, row in aiter_rows(user):
+            yield encode(kind, row)
+
+    return _achunked(lines())
+
+
+def to_csv(user):
+    header, encode = _csv_encoder()
+
+    def lines():
+        yield header
+        for kind, row in iter_rows(user):
+            yield encode(kind, row)
+
+    return _chunked(lines())
+
+
+def ato_csv(user):
+    header, encode = _csv_encoder()
+
+    async def lines():
+        yield header
+        async for kind, row in aiter_rows(user):
+            yield encode(kind, row)
+
+    return _achunked(lines())
+
+
+def _ndjson_encoder():
+    encode = JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    return lambda kind, row: encode({"type": kind, **row}) + "\n"
+
+
+def _csv_encoder():
+    """
+    Returns the header line and a function encoding a row as a line
+    """
+    writer = csv.writer(_Echo())
+
+    def encode(kind, row):
+        return writer.writerow(
+            [kind, *(_format_csv_value(row.get(c)) for c in COLUMNS[1:])]
+        )
+
+    return writer.writerow(COLUMNS), encode
+
+
+def _format_csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        # Same format as the JSON API
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+    return value
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+async def _achunked(lines):
+    chunk = []
+    async for line in lines:
+        chunk.append(line)
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from task_lists.models import List, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the tasks of every list and fixes the task_count of the lists where "
+        "it has drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Lists recounted per transaction (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        counts = (
+            Task.objects.filter(list=OuterRef("pk"))
+            .order_by()
+            .values("list")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        actual = Coalesce(Subquery(counts), 0)
+
+        checked = fixed = 0
+        last_id = None
+        while True:
+            batch = List.all_objects.order_by("pk")
+            if last_id is not None:
+                batch = batch.filter(pk__gt=last_id)
+            ids = list(batch.values_list("pk", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            with transaction.atomic():
+                # Locking the lists first makes tasks created or deleted concurrently
+                # either wait or be counted, like their change of task_count
+                list(
+                    List.all_objects.select_for_update()
+                    .filter(pk__in=ids)
+                    .values_list("pk")
+                )
+                fixed += (
+                    List.all_objects.filter(pk__in=ids)
+                    .alias(actual=actual)
+                    .exclude(task_count=F("actual"))
+                    .update(task_count=actual, updated_at=timezone.now())
+                )
+            checked += len(ids)
+            last_id = ids[-1]
+        self.stdout.write(f"Fixed the task count of {fixed} of {checked} lists")
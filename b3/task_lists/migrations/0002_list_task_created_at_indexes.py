@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:32
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="list",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="list_user_created_at_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["list", "-created_at", "-id"], name="task_list_created_at_idx"
+            ),
+        ),
+    ]
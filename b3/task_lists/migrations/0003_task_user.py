@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Only adds the column, which is instant. It's filled by 0004 and indexed by 0005
+    # without holding a lock on the table, then made NOT NULL by 0006 in a later
+    # deploy, once every task written meanwhile got its user from Task.save().
+
+    dependencies = [
+        ("task_lists", "0002_list_task_created_at_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
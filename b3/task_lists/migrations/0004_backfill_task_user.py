@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Tasks updated per transaction
+BATCH_SIZE = 10000
+
+# There's no max() for uuid
+BATCH_END = """
+SELECT id FROM (
+    SELECT id FROM task_lists_task WHERE id > %s ORDER BY id LIMIT %s
+) AS batch
+ORDER BY id DESC
+LIMIT 1
+"""
+
+BACKFILL = """
+UPDATE task_lists_task
+SET user_id = task_lists_list.user_id
+FROM task_lists_list
+WHERE task_lists_list.id = task_lists_task.list_id
+AND task_lists_task.id > %s
+AND task_lists_task.id <= %s
+AND task_lists_task.user_id IS NULL
+"""
+
+
+def backfill_task_user(apps, schema_editor):
+    """
+    Copies the user of each task's list in batches of the primary key order, each
+    one committed on its own so rows are only locked for the time of a batch
+    """
+    # The nil UUID, lower than the ids UUIDModel makes, which have a version
+    batch_start = "00000000-0000-0000-0000-000000000000"
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(BATCH_END, [batch_start, BATCH_SIZE])
+            row = cursor.fetchone()
+            if row is None:
+                break
+            (batch_end,) = row
+            cursor.execute(BACKFILL, [batch_start, batch_end])
+            batch_start = batch_end
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0003_task_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_task_user, migrations.RunPython.noop),
+    ]
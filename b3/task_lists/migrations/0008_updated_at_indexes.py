@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:36
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0007_tombstone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="list",
+            index=models.Index(
+                fields=["user", "updated_at"], name="list_user_updated_at_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "updated_at"], name="task_user_updated_at_idx"
+            ),
+        ),
+    ]
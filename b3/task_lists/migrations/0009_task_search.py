@@ -0,0 +1,64 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:18
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm ships with Postgres' contrib modules, the search works without it
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS task_name_trgm_idx "
+            "ON task_lists_task USING gin (name gin_trgm_ops) WITH (fastupdate = off)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS task_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0008_updated_at_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "name", config="simple", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="simple", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("simple"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fastupdate=False,
+                fields=["search_vector"],
+                name="task_search_vector_idx",
+            ),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_lists", "0009_task_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="list",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Only adds the column, 0012 fills it
+
+    dependencies = [
+        ("task_lists", "0010_list_deleted_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="list",
+            name="task_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, transaction
+
+# Lists counted per transaction
+BATCH_SIZE = 1000
+
+BATCH = """
+SELECT id FROM task_lists_list WHERE id > %s ORDER BY id LIMIT %s FOR UPDATE
+"""
+
+BACKFILL = """
+UPDATE task_lists_list
+SET task_count = (
+    SELECT COUNT(*) FROM task_lists_task
+    WHERE task_lists_task.list_id = task_lists_list.id
+)
+WHERE id = ANY(%s)
+"""
+
+
+def backfill_task_count(apps, schema_editor):
+    """
+    Counts the tasks of the lists in batches of the primary key order, each one in
+    its own transaction, like the rebuild_task_counts command which fixes counts
+    that drifted later
+
+    Locking the lists before counting makes tasks created or deleted concurrently,
+    which already change task_count, either wait or be counted.
+    """
+    # The nil UUID, lower than the ids UUIDModel makes, which have a version
+    batch_start = "00000000-0000-0000-0000-000000000000"
+    connection = schema_editor.connection
+    while True:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(BATCH, [batch_start, BATCH_SIZE])
+            ids = [list_id for list_id, in cursor.fetchall()]
+            if not ids:
+                break
+            cursor.execute(BACKFILL, [ids])
+        batch_start = ids[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0011_list_task_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_task_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# One notification per user and table for each statement writing lists or tasks,
+# see task_lists.changes. Postgres sends them on commit, and only once for the same
+# payload in a transaction.
+NOTIFY_FUNCTION = """
+CREATE FUNCTION task_lists_notify_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'task_lists_change',
+        json_build_object('user_id', users.user_id, 'type', TG_ARGV[0])::text
+    )
+    FROM (SELECT DISTINCT user_id FROM changed) AS users;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Transition tables can only be declared for one event per trigger
+TRIGGER = """
+CREATE TRIGGER {table}_notify_{event}
+AFTER {event} ON {table}
+REFERENCING {transition} TABLE AS changed
+FOR EACH STATEMENT EXECUTE FUNCTION task_lists_notify_change('{type}')
+"""
+
+TABLES = {"task_lists_list": "list", "task_lists_task": "task"}
+EVENTS = {"insert": "NEW", "update": "NEW", "delete": "OLD"}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_lists", "0012_backfill_task_count"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=NOTIFY_FUNCTION,
+            reverse_sql="DROP FUNCTION task_lists_notify_change()",
+        ),
+        *(
+            migrations.RunSQL(
+                sql=TRIGGER.format(
+                    table=table, event=event, transition=transition, type=object_type
+                ),
+                reverse_sql=f"DROP TRIGGER {table}_notify_{event} ON {table}",
+            )
+            for table, object_type in TABLES.items()
+            for event, transition in EVENTS.items()
+        ),
+    ]
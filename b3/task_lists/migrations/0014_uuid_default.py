@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_lists", "0013_change_notify_triggers"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="list",
+            name="id",
+            field=models.UUIDField(
+                default=utils.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="id",
+            field=models.UUIDField(
+                default=utils.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tombstone",
+            name="id",
+            field=models.UUIDField(
+                default=utils.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+
+def extension_available(cursor, name):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = %s", [name])
+    return cursor.fetchone() is not None
+
+
+def extension_installed(cursor, name):
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = %s", [name])
+    return cursor.fetchone() is not None
+
+
+def create_user_search_indexes(apps, schema_editor):
+    """
+    Replaces the search indexes of 0009 with ones that lead with user_id, so a
+    search only reads the index entries of the user's tasks instead of those of
+    every user's tasks that match
+
+    A GIN index on a uuid needs btree_gin, which ships with Postgres' contrib
+    modules like pg_trgm. Without it the indexes of 0009 are kept.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        if not extension_available(cursor, "btree_gin"):
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS task_user_search_vector_idx "
+            "ON task_lists_task USING gin (user_id, search_vector) "
+            "WITH (fastupdate = off)"
+        )
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS task_search_vector_idx")
+        if extension_installed(cursor, "pg_trgm"):
+            cursor.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS task_user_name_trgm_idx "
+                "ON task_lists_task USING gin (user_id, name gin_trgm_ops) "
+                "WITH (fastupdate = off)"
+            )
+            cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS task_name_trgm_idx")
+
+
+def drop_user_search_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS task_search_vector_idx "
+            "ON task_lists_task USING gin (search_vector) WITH (fastupdate = off)"
+        )
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS task_user_search_vector_idx")
+        if extension_installed(cursor, "pg_trgm"):
+            cursor.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS task_name_trgm_idx "
+                "ON task_lists_task USING gin (name gin_trgm_ops) "
+                "WITH (fastupdate = off)"
+            )
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS task_user_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("task_lists", "0014_uuid_default"),
+    ]
+
+    operations = [
+        # Which search indexes exist depends on the extensions, like the trigram
+        # index of 0009, so they're left out of the models' state
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="task", name="task_search_vector_idx"
+                ),
+            ],
+        ),
+        migrations.RunPython(create_user_search_indexes, drop_user_search_indexes),
+    ]
@@ -1,15 +1,229 @@
-from django.db import models
+import re
 
-from utils.models import TimestampedModel, UUIDModel
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.db import connections, models
+from django.db.models.functions import Cast, Greatest
+from django.utils import timezone
+
+from utils.db import has_extension
+from utils.models import TimestampedModel, UUIDModel, new_uuid_sql
+
+# Doesn't stem or drop stop words, so any language can be searched
+SEARCH_CONFIG = "simple"
+
+
+class ListManager(models.Manager):
+    """
+    Lists that aren't being deleted, see tasks.purge_list
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+    def count_tasks(self, counts):
+        """
+        Adds the number of tasks in `counts` by list id to the task_count of the lists
+
+        Called in the transaction that creates or deletes the tasks. updated_at is
+        bumped too, as the list's representation changed. The lists are updated in
+        order of their id so moves between two lists can't deadlock.
+        """
+        now = timezone.now()
+        for list_id, count in sorted(counts.items()):
+            if count:
+                self.filter(pk=list_id).update(
+                    task_count=models.F("task_count") + count, updated_at=now
+                )
+
+    def copy(self, list_, name):
+        """
+        Returns a new list named `name` with a copy of every task of `list_`
+
+        The list and its tasks are inserted by one statement, the tasks by INSERT ...
+        SELECT so they are never read into Python. The copies keep the created_at of
+        their task, and so its place in the list.
+        """
+        now = timezone.now()
+        copy = self.model(
+            user_id=list_.user_id, name=name, created_at=now, updated_at=now
+        )
+        # The foreign key of the tasks is only checked at commit, when their list
+        # has been inserted too
+        sql = f"""
+            WITH copied AS (
+                INSERT INTO {Task._meta.db_table}
+                    (id, list_id, user_id, name, description, created_at, updated_at)
+                SELECT
+                    {new_uuid_sql()}, %(id)s, user_id, name, description,
+                    created_at, %(now)s
+                FROM {Task._meta.db_table}
+                WHERE list_id = %(source_id)s
+                RETURNING 1
+            )
+            INSERT INTO {self.model._meta.db_table}
+                (id, user_id, name, task_count, created_at, updated_at)
+            SELECT %(id)s, %(user_id)s, %(name)s, COUNT(*), %(now)s, %(now)s
+            FROM copied
+            RETURNING task_count
+        """
+        params = {
+            "id": copy.pk,
+            "user_id": copy.user_id,
+            "name": name,
+            "now": now,
+            "source_id": list_.pk,
+        }
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            (copy.task_count,) = cursor.fetchone()
+        copy._state.adding = False
+        copy._state.db = self.db
+        return copy
 
 
 class List(UUIDModel, TimestampedModel):
     user = models.ForeignKey("users.User", on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    # Set when the list is deleted, it's hidden until it is purged with its tasks
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Maintained by ListManager.count_tasks(), rebuild_task_counts fixes any drift
+    task_count = models.IntegerField(default=0, editable=False)
+
+    objects = ListManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Matches ListViewSet: filter by user, newest first (and keyset pages)
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="list_user_created_at_idx",
+            ),
+            # Matches SyncView: filter by user and updated_at > watermark
+            models.Index(
+                fields=["user", "updated_at"],
+                name="list_user_updated_at_idx",
+            ),
+        ]
+
+
+class TaskQuerySet(models.QuerySet):
+    def of_user(self, user):
+        """
+        Returns the tasks of `user`, except the ones of their lists being deleted
+
+        Task.objects doesn't hide those by itself, which would join every task query
+        to its list. The tasks are matched by their own user_id instead, and the
+        lists being deleted are left out by id, a NOT IN of the user's few deleted
+        lists that Postgres hashes once and checks on the rows the task indexes find.
+        """
+        deleted = List.all_objects.filter(user=user).exclude(deleted_at=None)
+        return self.filter(user=user).exclude(list__in=deleted.values("pk"))
+
+    def search(self, text):
+        """
+        Returns the tasks whose name or description has all words of `text`, the last
+        one as a prefix so results show up while typing, annotated with their `rank`
+
+        With the pg_trgm extension, names that are similar to `text` match too, which
+        catches typos.
+        """
+        words = re.findall(r"\w+", text)
+        if not words:
+            return self.annotate(rank=models.Value(0.0)).none()
+
+        # \w never matches the quotes and operators of the tsquery syntax
+        terms = [f"'{word}'" for word in words]
+        terms[-1] += ":*"
+        query = SearchQuery(" & ".join(terms), config=SEARCH_CONFIG, search_type="raw")
+        condition = models.Q(search_vector=query)
+        rank = SearchRank(models.F("search_vector"), query)
+        if has_extension("pg_trgm", self.db):
+            condition |= models.Q(TrigramWordSimilar(models.F("name"), text))
+            rank = Greatest(rank, TrigramWordSimilarity(text, "name"))
+        # ts_rank() returns a real, read back as the shortest decimal that rounds to
+        # it, which doesn't compare equal to it again in a keyset cursor
+        return self.filter(condition).annotate(rank=Cast(rank, models.FloatField()))
 
 
 class Task(UUIDModel, TimestampedModel):
     list = models.ForeignKey(List, on_delete=models.CASCADE)
+    # Always list.user, stored on the task so ownership checks don't need a join.
+    # Indexed by task_user_idx, which migration 0005 creates concurrently.
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, db_index=False)
 
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
+    # Matched by TaskQuerySet.search(), names weigh more than descriptions
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    # Includes the tasks of lists being deleted, see TaskQuerySet.of_user()
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Matches the ownership checks by user
+            models.Index(fields=["user"], name="task_user_idx"),
+            # Matches TaskView: filter by list, newest first (and keyset pages)
+            models.Index(
+                fields=["list", "-created_at", "-id"],
+                name="task_list_created_at_idx",
+            ),
+            # Matches SyncView: filter by user and updated_at > watermark
+            models.Index(
+                fields=["user", "updated_at"],
+                name="task_user_updated_at_idx",
+            ),
+            # TaskSearchView's GIN indexes on search_vector and name are created by
+            # migrations 0009 and 0015, led by user_id with btree_gin and on name
+            # with pg_trgm, when the extensions are available
+        ]
+
+
+class TombstoneManager(models.Manager):
+    def record(self, user, object_type, object_ids):
+        return self.bulk_create(
+            [
+                self.model(user=user, object_type=object_type, object_id=object_id)
+                for object_id in object_ids
+            ]
+        )
+
+
+class Tombstone(UUIDModel):
+    """
+    Marks a deleted list or task so syncing clients know to drop it
+
+    Deleting a list only records the list, its tasks are implicitly deleted with it.
+    """
+
+    class ObjectType(models.TextChoices):
+        LIST = "list"
+        TASK = "task"
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE)
+    object_type = models.CharField(max_length=16, choices=ObjectType.choices)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_at"],
+                name="tombstone_user_deleted_at_idx",
+            ),
+        ]
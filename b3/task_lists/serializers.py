@@ -2,6 +2,9 @@ from rest_framework import serializers
 
 from . import models
 
+BULK_MAX_SIZE = 5000
+BULK_BATCH_SIZE = 1000
+
 
 class ListSerializer(serializers.ModelSerializer):
 
@@ -10,8 +13,10 @@ class ListSerializer(serializers.ModelSerializer):
         fields = (
             "id",
             "name",
+            "task_count",
+            "updated_at",
         )
-        read_only_fields = ("id",)
+        read_only_fields = ("id", "task_count", "updated_at")
 
     def save(self, **kwargs):
         return super().save(
@@ -20,6 +25,10 @@ class ListSerializer(serializers.ModelSerializer):
         )
 
 
+class ListCopySerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False)
+
+
 class TaskSerializer(serializers.ModelSerializer):
 
     list_id = serializers.UUIDField()
@@ -51,18 +60,32 @@ class TaskSerializer(serializers.ModelSerializer):
             )
 
     def validate(self, attrs):
-        is_task_owner = models.Task.objects.filter(
-            pk=self.context["task_id"],
-            list__user=self.context["request"].user,
-        ).exists()
-        if not is_task_owner:
-            raise serializers.ValidationError(
-                {"task_id": "You are not the owner of this task!"}
-            )
+        # Task ownership is checked when the view fetches the task, only moving it to
+        # another list needs a check
+        if (
+            self.instance is not None
+            and self.instance.list_id != self.context["list_id"]
+        ):
+            is_list_owner = models.List.objects.filter(
+                pk=self.context["list_id"],
+                user=self.context["request"].user,
+            ).exists()
+            if not is_list_owner:
+                raise serializers.ValidationError(
+                    {"list_id": "You are not the owner of this list!"}
+                )
 
         return attrs
 
 
+class TaskBulkCreateListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        return models.Task.objects.bulk_create(
+            [models.Task(**attrs) for attrs in validated_data],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     list_id = serializers.UUIDField(read_only=True)
 
@@ -75,9 +98,40 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "description",
         )
         read_only_fields = ("id",)
+        list_serializer_class = TaskBulkCreateListSerializer
 
     def save(self, **kwargs):
         return super().save(
             list_id=self.context["list_id"],
+            user=self.context["request"].user,
             **kwargs,
         )
+
+
+class TaskBulkUpdateSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField()
+
+    class Meta:
+        model = models.Task
+        fields = (
+            "id",
+            "name",
+            "description",
+        )
+        extra_kwargs = {"name": {"required": False}}
+
+
+class TaskBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=BULK_MAX_SIZE,
+    )
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
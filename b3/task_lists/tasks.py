@@ -0,0 +1,53 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from b3.celery import app
+from utils.models import delete_in_chunks
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+
+def delete_list(list_):
+    """
+    Hides the list and its tasks and purges them in the background
+    """
+    list_.deleted_at = timezone.now()
+    list_.save(update_fields=["deleted_at"])
+    transaction.on_commit(lambda: purge_list.delay(list_.pk))
+
+
+@app.task(bind=True)
+def purge_list(self, list_id):
+    """
+    Deletes a list hidden by delete_list() with its tasks, reporting the progress
+    """
+    lists = models.List.all_objects.filter(pk=list_id, deleted_at__isnull=False)
+    purge_lists(lists, ProgressReporter(self))
+
+
+def purge_lists(lists, report=None):
+    """
+    Deletes the lists one by one, their tasks in chunks
+    """
+    for list_id in lists.values_list("pk", flat=True):
+        delete_in_chunks(models.Task.objects.filter(list=list_id), report)
+        models.List.all_objects.filter(pk=list_id).delete()
+
+
+class ProgressReporter:
+    """
+    Publishes the number of rows a task has deleted as its PROGRESS state
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.deleted = 0
+
+    def __call__(self, count):
+        self.deleted += count
+        logger.info("%s deleted=%s", self.task.name, self.deleted)
+        self.task.update_state(state="PROGRESS", meta={"deleted": self.deleted})
@@ -12,8 +12,16 @@ class ListFactory(factory.django.DjangoModelFactory):
 
 class TaskFactory(factory.django.DjangoModelFactory):
     list = factory.SubFactory(ListFactory)
+    user = factory.SelfAttribute("list.user")
 
     name = factory.Faker("first_name")
 
     class Meta:
         model = models.Task
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        # Like the views, keeps the list's task_count in step
+        task = super()._create(model_class, *args, **kwargs)
+        models.List.objects.count_tasks({task.list_id: 1})
+        return task
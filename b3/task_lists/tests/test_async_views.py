@@ -0,0 +1,399 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import AsyncClient, override_settings
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from users.tests.factories import UserFactory
+from utils.test import ViewTestCase
+from utils.tests.test_throttling import REDIS_CACHES
+
+from .. import exports, models
+from . import factories
+
+ASYNC_URLCONF = "task_lists.tests.urls_async"
+
+
+class AsyncViewTestCase(ViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user)
+        cls.list_2 = factories.ListFactory(user=cls.user)
+        cls.task_1 = factories.TaskFactory(list=cls.list)
+        cls.task_2 = factories.TaskFactory(list=cls.list)
+        cls.other_list = factories.ListFactory()
+        cls.other_task = factories.TaskFactory(list=cls.other_list)
+
+    async def asetUp(self):
+        await self.async_client.aforce_login(self.user)
+
+    def url(self, name, **kwargs):
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            return reverse(f"task_list:{name}", kwargs=kwargs)
+
+    async def request(self, method, url, data=None, **kwargs):
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            if method != "get":
+                kwargs["content_type"] = "application/json"
+            return await getattr(self.async_client, method)(url, data, **kwargs)
+
+    async def assertSameAsSync(self, response, url, data=None):
+        await self.client.aforce_login(self.user)
+        sync_response = await sync_to_async(self.client.get)(url, data)
+        self.assertEqual(response.status_code, sync_response.status_code)
+        self.assertEqual(response.content, sync_response.content)
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+
+class ListViewTests(AsyncViewTestCase):
+    async def test_list(self):
+        await self.asetUp()
+        url = self.url("list-list")
+
+        response = await self.request("get", url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        await self.assertSameAsSync(response, url)
+
+        response = await self.request(
+            "get", url, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_list_cursor(self):
+        await self.asetUp()
+        url = self.url("list-list")
+
+        response = await self.request("get", url, {"cursor": "", "limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["id"] for row in response.json()["results"]], [str(self.list_2.pk)]
+        )
+        await self.assertSameAsSync(response, url, {"cursor": "", "limit": 1})
+
+        next_url = response.json()["next"]
+        response = await self.request("get", next_url)
+        self.assertEqual(
+            [row["id"] for row in response.json()["results"]], [str(self.list.pk)]
+        )
+        self.assertIsNone(response.json()["next"])
+
+        response = await self.request(
+            "get", next_url, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_unauthenticated(self):
+        response = await self.request("get", self.url("list-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.json(), {"detail": "Authentication credentials were not provided."}
+        )
+
+    async def test_create(self):
+        await self.asetUp()
+        response = await self.request("post", self.url("list-list"), {"name": "new"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        created = await models.List.objects.aget(pk=response.json()["id"])
+        self.assertEqual(created.name, "new")
+        self.assertEqual(created.user_id, self.user.pk)
+
+    async def test_create_invalid(self):
+        await self.asetUp()
+        response = await self.request("post", self.url("list-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"name": ["This field is required."]})
+
+    async def test_create_form(self):
+        await self.asetUp()
+        url = self.url("list-list")
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            response = await self.async_client.post(
+                url, "name=form", content_type="application/x-www-form-urlencoded"
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = await self.async_client.post(url, {"name": "multipart"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        names = [
+            name async for name in models.List.objects.values_list("name", flat=True)
+        ]
+        self.assertIn("form", names)
+        self.assertIn("multipart", names)
+
+    async def test_csrf(self):
+        client = AsyncClient(enforce_csrf_checks=True)
+        await client.aforce_login(self.user)
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            response = await client.post(
+                self.url("list-list"), {"name": "new"}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.json(), {"detail": "CSRF Failed: CSRF cookie not set."}
+        )
+
+    async def test_copy(self):
+        await self.asetUp()
+        await self.client.aforce_login(self.user)
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            url = self.url("list-copy", pk=self.list.pk)
+            response = await sync_to_async(self.client.post)(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["task_count"], 2)
+
+    async def test_retrieve(self):
+        await self.asetUp()
+        url = self.url("list-detail", pk=self.list.pk)
+
+        response = await self.request("get", url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await self.assertSameAsSync(response, url)
+
+        response = await self.request(
+            "get", self.url("list-detail", pk=self.other_list.pk)
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Not found."})
+
+    async def test_patch(self):
+        await self.asetUp()
+        url = self.url("list-detail", pk=self.list.pk)
+        etag = (await self.request("get", url))["ETag"]
+
+        response = await self.request(
+            "patch", url, {"name": "changed"}, headers={"If-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["name"], "changed")
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = await self.request(
+            "patch", url, {"name": "stale"}, headers={"If-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        await self.list.arefresh_from_db()
+        self.assertEqual(self.list.name, "changed")
+
+    async def test_delete(self):
+        await self.asetUp()
+        response = await self.request(
+            "delete", self.url("list-detail", pk=self.list.pk)
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertFalse(await models.List.objects.filter(pk=self.list.pk).aexists())
+        response = await self.request("get", self.url("task-list", pk=self.list.pk))
+        self.assertEqual(response.json()["results"], [])
+        self.assertTrue(
+            await models.Tombstone.objects.filter(object_id=self.list.pk).aexists()
+        )
+
+
+class TaskViewTests(AsyncViewTestCase):
+    async def test_list(self):
+        await self.asetUp()
+        url = self.url("task-list", pk=self.list.pk)
+
+        response = await self.request("get", url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        await self.assertSameAsSync(response, url)
+
+    async def test_create(self):
+        await self.asetUp()
+        url = self.url("task-list", pk=self.list.pk)
+
+        response = await self.request("post", url, {"name": "new"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        task = await models.Task.objects.aget(pk=response.json()["id"])
+        self.assertEqual(task.list_id, self.list.pk)
+        self.assertEqual(task.user_id, self.user.pk)
+        await self.list.arefresh_from_db()
+        self.assertEqual(self.list.task_count, 3)
+
+    @override_settings(CACHES=REDIS_CACHES)
+    async def test_create_idempotent(self):
+        await self.asetUp()
+        self.addCleanup(get_redis_connection().delete, *self.idempotency_keys())
+        url = self.url("task-list", pk=self.list.pk)
+        headers = {"Idempotency-Key": "async-key"}
+
+        response = await self.request("post", url, {"name": "new"}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        replayed = await self.request("post", url, {"name": "new"}, headers=headers)
+        self.assertEqual(replayed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(replayed.content, response.content)
+        self.assertEqual(await models.Task.objects.filter(name="new").acount(), 1)
+
+        response = await self.request("post", url, {"name": "other"}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def idempotency_keys(self):
+        key = f"idempotency:{self.user.pk}:async-key"
+        return key, f"{key}:lock"
+
+    async def test_create_other(self):
+        await self.asetUp()
+        url = self.url("task-list", pk=self.other_list.pk)
+
+        response = await self.request("post", url, {"name": "new"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_retrieve(self):
+        await self.asetUp()
+        url = self.url("task-detail", pk=self.list.pk, task_id=self.task_1.pk)
+
+        response = await self.request("get", url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await self.assertSameAsSync(response, url)
+
+        url = self.url("task-detail", pk=self.other_list.pk, task_id=self.other_task.pk)
+        response = await self.request("get", url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_patch_move(self):
+        await self.asetUp()
+        url = self.url("task-detail", pk=self.list_2.pk, task_id=self.task_1.pk)
+
+        response = await self.request("patch", url, {"name": "moved"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["list_id"], str(self.list_2.pk))
+        await self.list.arefresh_from_db()
+        await self.list_2.arefresh_from_db()
+        self.assertEqual(self.list.task_count, 1)
+        self.assertEqual(self.list_2.task_count, 1)
+
+        url = self.url("task-detail", pk=self.other_list.pk, task_id=self.task_1.pk)
+        response = await self.request("patch", url, {"name": "moved"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_delete_if_match(self):
+        await self.asetUp()
+        url = self.url("task-detail", pk=self.list.pk, task_id=self.task_1.pk)
+        etag = (await self.request("get", url))["ETag"]
+        await self.request("patch", url, {"name": "changed"})
+
+        response = await self.request("delete", url, headers={"If-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        response = await self.request("delete", url, headers={"If-Match": "*"})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await models.Task.objects.filter(pk=self.task_1.pk).aexists())
+        await self.list.arefresh_from_db()
+        self.assertEqual(self.list.task_count, 1)
+
+
+class ExportViewTests(AsyncViewTestCase):
+    async def asgi_get(self, path, on_body):
+        """
+        Returns the status and the body of a GET through the ASGI handler, like
+        uvicorn serves it, calling `on_body()` when the first chunk is sent
+        """
+        await self.asetUp()
+        session_cookie = self.async_client.cookies[settings.SESSION_COOKIE_NAME]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", f"{session_cookie.key}={session_cookie.value}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client stays connected
+            return await asyncio.Future()
+
+        messages = []
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not any(
+                sent["type"] == "http.response.body" for sent in messages
+            ):
+                await on_body()
+            messages.append(message)
+
+        # Like the test client, keeps the connection of the test's transaction open
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+                await ASGIHandler()(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        body = b"".join(
+            message.get("body", b"")
+            for message in messages
+            if message["type"] == "http.response.body"
+        )
+        return messages[0]["status"], body
+
+    @patch.object(exports, "ROWS_PER_CHUNK", 1)
+    async def test_streamed(self):
+        created = []
+
+        async def create_task():
+            created.append(
+                await models.Task.objects.acreate(list=self.list_2, user=self.user)
+            )
+
+        # The task is written once the first list is sent, the tasks are read after
+        # it only if the export is streamed
+        status_code, body = await self.asgi_get(self.url("export"), create_task)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(
+            [row["type"] for row in rows], ["list", "list", "task", "task", "task"]
+        )
+        self.assertIn(str(created[0].pk), {row["id"] for row in rows})
+
+    async def test_csv(self):
+        await self.asetUp()
+        response = await self.request("get", self.url("export"), {"file_format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join([chunk async for chunk in response.streaming_content])
+
+        await self.client.aforce_login(self.user)
+
+        def sync_export():
+            response = self.client.get(self.url("export"), {"file_format": "csv"})
+            return b"".join(response.streaming_content)
+
+        self.assertEqual(content, await sync_to_async(sync_export)())
+
+    async def test_invalid_format(self):
+        await self.asetUp()
+        response = await self.request("get", self.url("export"), {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
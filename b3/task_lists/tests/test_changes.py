@@ -0,0 +1,165 @@
+import asyncio
+import contextlib
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from rest_framework import status
+
+from users.tests.factories import UserFactory
+
+from .. import changes, models
+from . import factories
+from .test_async_views import AsyncViewTestCase
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class ChangeFeedTests(TransactionTestCase):
+    """
+    Postgres only sends notifications on commit, so these can't run in a TestCase
+    """
+
+    async def get(self, subscription):
+        return await asyncio.wait_for(subscription.get(), 5)
+
+    async def assertNoChange(self, subscription):
+        with self.assertRaises(TimeoutError):
+            await asyncio.wait_for(subscription.get(), 0.2)
+
+    async def test_notify(self):
+        user, other_user = await sync_to_async(UserFactory.create_batch)(2)
+        async with changes.feed.subscribe(user.pk) as subscription:
+            # Everything has changed once listening
+            self.assertEqual(await self.get(subscription), {"list", "task"})
+
+            task_list = await sync_to_async(factories.ListFactory)(user=user)
+            self.assertEqual(await self.get(subscription), {"list"})
+            task = await models.Task.objects.acreate(list=task_list, user=user)
+            self.assertEqual(await self.get(subscription), {"task"})
+            await sync_to_async(self.move_task)(task, task_list)
+            self.assertEqual(await self.get(subscription), {"list", "task"})
+            await models.Task.objects.filter(pk=task.pk).aupdate(name="Renamed")
+            self.assertEqual(await self.get(subscription), {"task"})
+            await task.adelete()
+            self.assertEqual(await self.get(subscription), {"task"})
+
+            await sync_to_async(factories.TaskFactory)(list__user=other_user)
+            await self.assertNoChange(subscription)
+
+            await sync_to_async(self.create_rolled_back)(user)
+            await self.assertNoChange(subscription)
+
+        self.assertEqual(changes.feed.subscriptions, {})
+        self.assertIsNone(changes.feed.listener)
+
+    def move_task(self, task, task_list):
+        # Like the views, in one transaction
+        with transaction.atomic():
+            new_list = factories.ListFactory(user=task_list.user)
+            task.list = new_list
+            task.save()
+
+    def create_rolled_back(self, user):
+        with transaction.atomic():
+            factories.ListFactory(user=user)
+            transaction.set_rollback(True)
+
+    async def test_invalid_payload(self):
+        user = await sync_to_async(UserFactory)()
+        async with changes.feed.subscribe(user.pk) as subscription:
+            await self.get(subscription)
+            with self.assertLogs("task_lists.changes", "ERROR"):
+                await sync_to_async(self.notify)("not json")
+                await sync_to_async(self.notify)(json.dumps({"type": "list"}))
+                await sync_to_async(factories.ListFactory)(user=user)
+                self.assertEqual(await self.get(subscription), {"list"})
+
+    def notify(self, payload):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [changes.CHANNEL, payload])
+
+    async def test_listener_restarted(self):
+        user = await sync_to_async(UserFactory)()
+        connect = patch.object(changes.feed, "connect", side_effect=ValueError)
+        connect.start()
+        async with changes.feed.subscribe(user.pk) as first:
+            listener = changes.feed.listener
+            with self.assertLogs("task_lists.changes", "ERROR"):
+                await listener
+            connect.stop()
+            self.assertIsNone(changes.feed.listener)
+
+            async with changes.feed.subscribe(user.pk) as second:
+                self.assertEqual(await self.get(second), {"list", "task"})
+                self.assertEqual(await self.get(first), {"list", "task"})
+        self.assertIsNone(changes.feed.listener)
+
+    async def test_subscribers(self):
+        user = await sync_to_async(UserFactory)()
+        async with changes.feed.subscribe(user.pk) as first:
+            await self.get(first)
+            async with changes.feed.subscribe(user.pk) as second:
+                # The listener is already running
+                self.assertEqual(await self.get(second), {"list", "task"})
+                await sync_to_async(factories.ListFactory)(user=user)
+                self.assertEqual(await self.get(first), {"list"})
+                self.assertEqual(await self.get(second), {"list"})
+            self.assertIsNotNone(changes.feed.listener)
+        self.assertIsNone(changes.feed.listener)
+
+
+@override_settings(CHANGE_STREAM_HEARTBEAT=0.1)
+class ChangeStreamViewTests(AsyncViewTestCase):
+    async def test_stream(self):
+        await self.asetUp()
+        response = await self.request(
+            "get", self.url("changes"), headers={"Accept-Encoding": "br"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertNotIn("Content-Encoding", response)
+
+        received = asyncio.Queue()
+
+        async def send_response():
+            async for chunk in response.streaming_content:
+                await received.put(chunk)
+
+        async def next_event():
+            while (chunk := await asyncio.wait_for(received.get(), 5)) == KEEPALIVE:
+                pass
+            return chunk
+
+        # Like the ASGI handler, which cancels it when the client disconnects
+        sending = asyncio.create_task(send_response())
+        try:
+            self.assertEqual(await next_event(), b"retry: 5000\n\n")
+            self.assertEqual(
+                await next_event(),
+                b'event: change\ndata: {"changed": ["list", "task"]}\n\n',
+            )
+            changes.feed.dispatch(
+                json.dumps({"user_id": str(self.user.pk), "type": "task"})
+            )
+            self.assertEqual(
+                await next_event(), b'event: change\ndata: {"changed": ["task"]}\n\n'
+            )
+            # Other users' changes aren't sent
+            changes.feed.dispatch(
+                json.dumps({"user_id": str(self.other_list.user_id), "type": "task"})
+            )
+            self.assertEqual(await asyncio.wait_for(received.get(), 5), KEEPALIVE)
+        finally:
+            sending.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await sending
+        self.assertEqual(changes.feed.subscriptions, {})
+        self.assertIsNone(changes.feed.listener)
+
+    async def test_anonymous(self):
+        response = await self.request("get", self.url("changes"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,37 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import models
+from . import factories
+
+
+class RebuildTaskCountsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list = factories.ListFactory()
+        factories.TaskFactory.create_batch(3, list=cls.list)
+        cls.list_2 = factories.ListFactory()
+        factories.TaskFactory(list=cls.list_2)
+        cls.empty_list = factories.ListFactory()
+
+    def test_rebuild(self):
+        models.List.objects.filter(pk=self.list.pk).update(task_count=7)
+        models.List.objects.filter(pk=self.empty_list.pk).update(task_count=-1)
+        updated_at = models.List.objects.get(pk=self.list_2.pk).updated_at
+
+        out = io.StringIO()
+        # Per batch: ids, savepoint, lock, update, release, and the empty last batch
+        with self.assertNumQueries(11):
+            call_command("rebuild_task_counts", batch_size=2, stdout=out)
+        self.assertEqual(out.getvalue(), "Fixed the task count of 2 of 3 lists\n")
+
+        counts = dict(models.List.objects.values_list("pk", "task_count"))
+        self.assertEqual(
+            counts, {self.list.pk: 3, self.list_2.pk: 1, self.empty_list.pk: 0}
+        )
+        # Lists that were right are left alone
+        self.assertEqual(
+            models.List.objects.get(pk=self.list_2.pk).updated_at, updated_at
+        )
@@ -1,12 +1,20 @@
-from unittest.mock import ANY
-
+import csv
+import datetime
+import io
+import json
+from unittest.mock import ANY, patch
+
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 
 from users.tests.factories import UserFactory
+from utils.db import has_extension
+from utils.pagination import KeysetPagination
 from utils.test import ViewTestCase
 
-from .. import models
+from .. import models, serializers
 from . import factories
 
 
@@ -48,6 +56,7 @@ class ListViewSetTests(ViewTestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         self.assertEqual(response.data["id"], str(self.list.pk))
+        self.assertEqual(response.data["task_count"], 2)
 
     def test_retrieve_other(self):
         response = self.client.get(self.other_detail_url)
@@ -62,6 +71,49 @@ class ListViewSetTests(ViewTestCase):
         self.assertEqual(response.data["results"][0]["id"], str(self.list_2.pk))
         self.assertEqual(response.data["results"][1]["id"], str(self.list.pk))
 
+    def test_list_cursor(self):
+        # The page alone, its ETag is made from it
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {"cursor": ""})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(response.data["results"][0]["id"], str(self.list_2.pk))
+        self.assertEqual(response.data["results"][1]["id"], str(self.list.pk))
+
+    @patch.object(KeysetPagination, "page_size", 1)
+    def test_list_cursor_pages(self):
+        response = self.client.get(self.list_url, {"cursor": ""})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], str(self.list_2.pk))
+
+        # The page alone, its ETag is made from it
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], str(self.list.pk))
+        self.assertIsNone(response.data["next"])
+
+    def test_list_cursor_same_created_at(self):
+        models.List.objects.filter(user=self.user).update(
+            created_at=self.list.created_at
+        )
+        ids = sorted([str(self.list.pk), str(self.list_2.pk)], reverse=True)
+
+        response = self.client.get(self.list_url, {"cursor": "", "limit": 1})
+        self.assertEqual(response.data["results"][0]["id"], ids[0])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"][0]["id"], ids[1])
+        self.assertIsNone(response.data["next"])
+
+    def test_list_cursor_invalid(self):
+        response = self.client.get(self.list_url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_patch_change_name(self):
         data = {
             "name": self.list.name + "adding something",
@@ -87,18 +139,145 @@ class ListViewSetTests(ViewTestCase):
         self.other_list.refresh_from_db()
         self.assertNotEqual(self.other_list, data["name"])
 
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.client.patch(self.detail_url, data={"name": "changed"})
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_not_modified(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(self.detail_url)
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+
+        factories.ListFactory(user=self.user)
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+    @patch.object(KeysetPagination, "page_size", 1)
+    def test_list_cursor_not_modified(self):
+        response = self.client.get(self.list_url, {"cursor": ""})
+        next_url = response.data["next"]
+        response = self.client.get(next_url)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(next_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Another page doesn't match
+        response = self.client.get(
+            self.list_url, {"cursor": ""}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.list.name += " renamed"
+        self.list.save()
+
+        response = self.client.get(next_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_patch_if_match(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        # Locking the row adds a savepoint
+        with self.assertNumQueries(4):
+            response = self.client.patch(
+                self.detail_url, data={"name": "first"}, HTTP_IF_MATCH=etag
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(
+            self.detail_url, data={"name": "second"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.name, "first")
+
+    def test_patch_if_match_compressed(self):
+        # The ETag of a compressed response is weak
+        etag = "W/" + self.client.get(self.detail_url)["ETag"]
+        response = self.client.patch(
+            self.detail_url, data={"name": "first"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_delete_if_match(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.patch(self.detail_url, data={"name": "changed"})
+
+        response = self.client.delete(self.detail_url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(models.List.objects.filter(pk=self.list.pk).exists())
+
+        response = self.client.delete(self.detail_url, HTTP_IF_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
     def test_delete(self):
-        with self.assertNumQueries(3):
+        # Select, savepoint, tombstone, hide list, release
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(5):
             response = self.client.delete(self.detail_url)
             self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
-        with self.assertRaises(models.List.DoesNotExist):
-            self.list.refresh_from_db()
+        self.assertTrue(
+            models.Tombstone.objects.filter(
+                user=self.user, object_type="list", object_id=self.list.pk
+            ).exists()
+        )
+
+        # Hidden until the purge runs
+        task_ids = [self.task_1.pk, self.task_2.pk]
+        self.assertFalse(models.List.objects.filter(pk=self.list.pk).exists())
+        response = self.client.get(reverse("task_list:sync"))
+        self.assertEqual(len(response.data["lists"]), 1)
+        self.assertEqual(response.data["tasks"], [])
+        task_list_url = reverse("task_list:task-list", kwargs={"pk": self.list.pk})
+        self.assertEqual(self.client.get(task_list_url).data["results"], [])
+        task_url = reverse(
+            "task_list:task-detail",
+            kwargs={"pk": self.list.pk, "task_id": self.task_1.pk},
+        )
+        response = self.client.get(task_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            reverse("task_list:task-search"), {"q": self.task_1.name}
+        )
+        self.assertEqual(response.data["results"], [])
 
-        task_count = models.Task.objects.filter(
-            pk__in=[self.task_1.pk, self.task_2.pk]
-        ).count()
-        self.assertEqual(task_count, 0)
+        [purge] = callbacks
+        purge()
+        self.assertFalse(models.List.all_objects.filter(pk=self.list.pk).exists())
+        self.assertFalse(models.Task.objects.filter(pk__in=task_ids).exists())
 
     def test_delete_other(self):
         with self.assertNumQueries(1):
@@ -125,6 +304,53 @@ class ListViewSetTests(ViewTestCase):
         my_new_list_count = models.List.objects.filter(user=self.user).count()
         self.assertEqual(my_new_list_count, my_list_count + 1)
 
+    def test_copy(self):
+        url = reverse("task_list:list-copy", kwargs={"pk": self.list.pk})
+        with self.assertNumQueries(2):  # Ownership, insert
+            response = self.client.post(url, data={"name": "copy"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(response.data["name"], "copy")
+        self.assertEqual(response.data["task_count"], 2)
+        copy = models.List.objects.get(pk=response.data["id"])
+        self.assertEqual(copy.user_id, self.user.pk)
+        self.assertEqual(copy.task_count, 2)
+        originals = self.list.task_set.order_by("-created_at")
+        copies = copy.task_set.order_by("-created_at")
+        self.assertEqual(
+            [(task.name, task.description, task.user_id) for task in copies],
+            [(task.name, task.description, task.user_id) for task in originals],
+        )
+        self.assertTrue(
+            set(copies.values_list("pk")).isdisjoint(originals.values_list("pk"))
+        )
+
+        # The list's name by default, and empty lists too
+        url = reverse("task_list:list-copy", kwargs={"pk": self.list_2.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], self.list_2.name)
+        self.assertEqual(response.data["task_count"], 0)
+
+    @override_settings(UUID7=True)
+    def test_copy_uuid7(self):
+        url = reverse("task_list:list-copy", kwargs={"pk": self.list.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        copy = models.List.objects.get(pk=response.data["id"])
+        self.assertEqual(copy.pk.version, 7)
+        self.assertEqual(
+            {task_id.version for task_id in copy.task_set.values_list("pk", flat=True)},
+            {7},
+        )
+
+    def test_copy_other(self):
+        url = reverse("task_list:list-copy", kwargs={"pk": self.other_list.pk})
+        with self.assertNumQueries(1):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(models.List.objects.filter(user=self.user).count(), 2)
+
 
 class TaskViewTests(ViewTestCase):
     @classmethod
@@ -187,12 +413,31 @@ class TaskViewTests(ViewTestCase):
         self.assertEqual(response.data["results"][0]["id"], str(self.task_2.pk))
         self.assertEqual(response.data["results"][1]["id"], str(self.task_1.pk))
 
+    @patch.object(KeysetPagination, "page_size", 1)
+    def test_list_cursor(self):
+        # The page alone, its ETag is made from it
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {"cursor": ""})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], str(self.task_2.pk))
+
+        # The page alone, its ETag is made from it
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], str(self.task_1.pk))
+        self.assertIsNone(response.data["next"])
+
     def test_patch_change_metadata(self):
         data = {
             "name": self.task_1.name + "new",
             "description": self.task_1.description + "looong",
         }
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(2):
             response = self.client.patch(self.detail_url, data=data)
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -200,6 +445,36 @@ class TaskViewTests(ViewTestCase):
         self.assertEqual(self.task_1.name, data["name"])
         self.assertEqual(self.task_1.description, data["description"])
 
+    def test_patch_move_to_my_other_list(self):
+        url = reverse(
+            "task_list:task-detail",
+            kwargs={"pk": self.list_2.pk, "task_id": self.task_1.pk},
+        )
+        # Select, ownership, savepoint, lock, update, both counts, release
+        with self.assertNumQueries(8):
+            response = self.client.patch(url, data={"name": "moved"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.list_id, self.list_2.pk)
+        self.assertEqual(self.task_1.user_id, self.user.pk)
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.task_count, 1)
+        self.list_2.refresh_from_db()
+        self.assertEqual(self.list_2.task_count, 1)
+
+    def test_patch_move_to_other_list(self):
+        url = reverse(
+            "task_list:task-detail",
+            kwargs={"pk": self.other_list.pk, "task_id": self.task_1.pk},
+        )
+        with self.assertNumQueries(2):
+            response = self.client.patch(url, data={"name": "moved"})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.list_id, self.list.pk)
+
     def test_patch_add_my_task_to_my_other_list(self):
         data = {
             "list_id": self.list_2,
@@ -225,7 +500,8 @@ class TaskViewTests(ViewTestCase):
     def test_delete(self):
         self.assertEqual(self.list.task_set.count(), 2)
 
-        with self.assertNumQueries(2):
+        # Select, savepoint, tombstone, delete, count, release
+        with self.assertNumQueries(6):
             response = self.client.delete(self.detail_url)
             self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
@@ -233,6 +509,13 @@ class TaskViewTests(ViewTestCase):
             self.task_1.refresh_from_db()
 
         self.assertEqual(self.list.task_set.count(), 1)
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.task_count, 1)
+        self.assertTrue(
+            models.Tombstone.objects.filter(
+                user=self.user, object_type="task", object_id=self.task_1.pk
+            ).exists()
+        )
 
     def test_delete_other(self):
         self.assertEqual(self.other_list.task_set.count(), 1)
@@ -247,7 +530,8 @@ class TaskViewTests(ViewTestCase):
         my_list_task_count = self.list.task_set.count()
 
         data = {"name": "my cool new task"}
-        with self.assertNumQueries(1):
+        # Ownership, savepoint, insert, count, release
+        with self.assertNumQueries(5):
             response = self.client.post(self.list_url, data=data)
             self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
@@ -255,3 +539,451 @@ class TaskViewTests(ViewTestCase):
 
         my_new_list_task_count = self.list.task_set.count()
         self.assertEqual(my_new_list_task_count, my_list_task_count + 1)
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.task_count, my_new_list_task_count)
+        task = models.Task.objects.get(pk=response.data["id"])
+        self.assertEqual(task.user_id, self.user.pk)
+
+    def test_create_other(self):
+        url = reverse("task_list:task-list", kwargs={"pk": self.other_list.pk})
+        with self.assertNumQueries(1):
+            response = self.client.post(url, data={"name": "not mine"})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(self.other_list.task_set.count(), 1)
+
+    def test_list_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.detail_url, data={"name": "changed"})
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_patch_if_match(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.patch(
+            self.detail_url, data={"name": "first"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(
+            self.detail_url, data={"name": "second"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+
+class TaskBulkViewTests(ViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.other_user = UserFactory()
+
+        cls.list = factories.ListFactory(user=cls.user)
+        cls.list_2 = factories.ListFactory(user=cls.user)
+        cls.other_list = factories.ListFactory(user=cls.other_user)
+
+        cls.task_1 = factories.TaskFactory(list=cls.list)
+        cls.task_2 = factories.TaskFactory(list=cls.list)
+        cls.task_3 = factories.TaskFactory(list=cls.list_2)
+        cls.other_task = factories.TaskFactory(list=cls.other_list)
+
+        cls.url = reverse("task_list:task-bulk", kwargs={"pk": cls.list.pk})
+        cls.other_url = reverse("task_list:task-bulk", kwargs={"pk": cls.other_list.pk})
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_create(self):
+        data = [{"name": f"task {i}"} for i in range(10)]
+        # Ownership, savepoint, insert, count, release
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]["list_id"], str(self.list.pk))
+        tasks = models.Task.objects.filter(list=self.list, name__startswith="task ")
+        self.assertEqual(tasks.count(), 10)
+        self.assertFalse(tasks.exclude(user=self.user).exists())
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.task_count, 12)
+
+    def test_create_errors(self):
+        data = [{"name": "ok"}, {}, {"name": "x" * 256}]
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(list(response.data[1]), ["name"])
+        self.assertEqual(list(response.data[2]), ["name"])
+        self.assertEqual(self.list.task_set.count(), 2)
+
+    def test_create_too_many(self):
+        with patch.object(serializers, "BULK_MAX_SIZE", 2):
+            data = [{"name": "task"}] * 3
+            response = self.client.post(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.list.task_set.count(), 2)
+
+    def test_create_other(self):
+        data = [{"name": "not mine"}]
+        response = self.client.post(self.other_url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.other_list.task_set.count(), 1)
+
+    def test_update(self):
+        data = [
+            {"id": str(self.task_1.pk), "name": "new name"},
+            {"id": str(self.task_2.pk), "description": "new description"},
+        ]
+        with self.assertNumQueries(4):  # Select, savepoint, update, release
+            response = self.client.patch(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data[0]["id"], str(self.task_1.pk))
+        self.assertEqual(response.data[0]["name"], "new name")
+
+        updated_at = self.task_1.updated_at
+        self.task_1.refresh_from_db()
+        self.task_2.refresh_from_db()
+        self.assertEqual(self.task_1.name, "new name")
+        self.assertGreater(self.task_1.updated_at, updated_at)
+        self.assertEqual(self.task_2.description, "new description")
+
+    def test_update_many(self):
+        tasks = factories.TaskFactory.create_batch(50, list=self.list)
+        data = [{"id": str(task.pk), "name": "updated"} for task in tasks]
+
+        with self.assertMaxNumQueries(4):
+            response = self.client.patch(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_errors(self):
+        name = self.task_1.name
+        data = [
+            {"id": str(self.task_1.pk), "name": "new name"},
+            {"id": str(self.task_3.pk), "name": "other list"},
+            {"id": str(self.other_task.pk), "name": "not mine"},
+            {"id": str(self.task_1.pk), "name": "again"},
+            {"name": "no id"},
+        ]
+        response = self.client.patch(self.url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data[4]), ["id"])
+
+        response = self.client.patch(self.url, data=data[:4], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(list(response.data[1]), ["id"])
+        self.assertEqual(list(response.data[2]), ["id"])
+        self.assertEqual(list(response.data[3]), ["id"])
+
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.name, name)
+
+    def test_delete(self):
+        data = {"ids": [str(self.task_1.pk)]}
+        # Savepoint, select, tombstones, delete, count, release
+        with self.assertNumQueries(6):
+            response = self.client.delete(self.url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertFalse(models.Task.objects.filter(pk=self.task_1.pk).exists())
+        self.assertTrue(models.Task.objects.filter(pk=self.task_2.pk).exists())
+        self.assertTrue(models.Task.objects.filter(pk=self.task_3.pk).exists())
+        self.assertQuerySetEqual(
+            models.Tombstone.objects.values_list("object_id", flat=True),
+            [self.task_1.pk],
+        )
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.task_count, 1)
+        self.list_2.refresh_from_db()
+        self.assertEqual(self.list_2.task_count, 1)
+
+    def test_delete_other(self):
+        data = {"ids": [str(self.other_task.pk)]}
+        response = self.client.delete(self.other_url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["ids"]), [0])
+        self.assertTrue(models.Task.objects.filter(pk=self.other_task.pk).exists())
+
+    def test_delete_errors(self):
+        data = {"ids": [str(self.task_1.pk), "invalid"]}
+        response = self.client.delete(self.url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["ids"]), [1])
+
+        data = {
+            "ids": [
+                str(self.task_1.pk),
+                str(self.task_3.pk),
+                str(self.other_task.pk),
+                str(self.task_1.pk),
+            ]
+        }
+        response = self.client.delete(self.url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["ids"]), [1, 2, 3])
+
+        self.assertTrue(models.Task.objects.filter(pk=self.task_1.pk).exists())
+        self.assertFalse(models.Tombstone.objects.exists())
+
+
+class ExportViewTests(ViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user, name="groceries")
+        cls.task_1 = factories.TaskFactory(list=cls.list, description='say "hi",\n')
+        cls.task_2 = factories.TaskFactory(list=cls.list)
+
+        other_list = factories.ListFactory()
+        factories.TaskFactory(list=other_list)
+        # Creating the tasks updated the list
+        cls.list.refresh_from_db()
+
+        cls.url = reverse("task_list:export")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_ndjson(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            rows[0],
+            {
+                "type": "list",
+                "id": str(self.list.pk),
+                "name": "groceries",
+                "created_at": self.list.created_at.isoformat().replace("+00:00", "Z"),
+                "updated_at": self.list.updated_at.isoformat().replace("+00:00", "Z"),
+            },
+        )
+        tasks = {row["id"]: row for row in rows[1:]}
+        self.assertSetEqual(set(tasks), {str(self.task_1.pk), str(self.task_2.pk)})
+        self.assertEqual(tasks[str(self.task_1.pk)]["list_id"], str(self.list.pk))
+        self.assertEqual(
+            tasks[str(self.task_1.pk)]["description"], self.task_1.description
+        )
+
+    def test_csv(self):
+        with self.assertMaxNumQueries(2):
+            response = self.client.get(self.url, {"file_format": "csv"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            content = b"".join(response.streaming_content).decode()
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["type"], "list")
+        self.assertEqual(rows[0]["list_id"], "")
+        tasks = {row["id"]: row for row in rows[1:]}
+        self.assertEqual(
+            tasks[str(self.task_1.pk)]["description"], self.task_1.description
+        )
+
+    def test_invalid_format(self):
+        response = self.client.get(self.url, {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SyncViewTests(ViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user)
+        cls.list_2 = factories.ListFactory(user=cls.user)
+        cls.task_1 = factories.TaskFactory(list=cls.list)
+        cls.task_2 = factories.TaskFactory(list=cls.list)
+        factories.TaskFactory()
+
+        cls.url = reverse("task_list:sync")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_full_sync(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertSetEqual(
+            {row["id"] for row in response.data["lists"]},
+            {str(self.list.pk), str(self.list_2.pk)},
+        )
+        self.assertSetEqual(
+            {row["id"] for row in response.data["tasks"]},
+            {str(self.task_1.pk), str(self.task_2.pk)},
+        )
+        self.assertEqual(response.data["deleted"], {"lists": [], "tasks": []})
+        self.assertLess(response.data["watermark"], timezone.now())
+        self.assertIsNone(response.data["next"])
+
+    def test_delta_sync(self):
+        since = timezone.now()
+        long_ago = since - datetime.timedelta(days=1)
+        models.List.objects.update(updated_at=long_ago)
+        models.Task.objects.update(updated_at=long_ago)
+
+        self.task_2.name = "changed"
+        self.task_2.save()
+        models.Tombstone.objects.create(
+            user=self.user, object_type="list", object_id=self.list_2.pk
+        )
+        models.Tombstone.objects.create(
+            user=self.user,
+            object_type="task",
+            object_id=self.task_1.pk,
+            deleted_at=long_ago,
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"since": since.isoformat()})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data["lists"], [])
+        self.assertEqual(
+            [row["id"] for row in response.data["tasks"]], [str(self.task_2.pk)]
+        )
+        self.assertEqual(
+            response.data["deleted"], {"lists": [self.list_2.pk], "tasks": []}
+        )
+
+    def test_pages(self):
+        since = timezone.now()
+        for task in (self.task_2, self.task_1):
+            task.name = "changed"
+            task.save()
+        models.Tombstone.objects.create(
+            user=self.user, object_type="list", object_id=self.list_2.pk
+        )
+
+        response = self.client.get(self.url, {"since": since.isoformat(), "limit": 1})
+        self.assertEqual(response.data["lists"], [])
+        self.assertEqual(
+            [row["id"] for row in response.data["tasks"]], [str(self.task_2.pk)]
+        )
+        self.assertEqual(response.data["deleted"]["lists"], [self.list_2.pk])
+        watermark = response.data["watermark"]
+
+        # Changed after the first page, left for the next sync
+        self.task_2.name = "changed again"
+        self.task_2.save()
+        factories.TaskFactory(list=self.list)
+
+        # The tasks left, the lists were all sent
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            [row["id"] for row in response.data["tasks"]], [str(self.task_1.pk)]
+        )
+        self.assertEqual(response.data["deleted"], {"lists": [], "tasks": []})
+        self.assertEqual(response.data["watermark"], watermark)
+        self.assertIsNone(response.data["next"])
+
+    def test_pages_same_updated_at(self):
+        models.Task.objects.filter(user=self.user).update(
+            updated_at=self.task_1.updated_at
+        )
+        ids = sorted([str(self.task_1.pk), str(self.task_2.pk)])
+
+        response = self.client.get(self.url, {"limit": 1})
+        self.assertEqual([row["id"] for row in response.data["tasks"]], ids[:1])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["tasks"]], ids[1:])
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_since(self):
+        response = self.client.get(self.url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskSearchViewTests(ViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user)
+        cls.list_2 = factories.ListFactory(user=cls.user)
+        cls.in_name = factories.TaskFactory(list=cls.list, name="Buy Groceries")
+        cls.in_description = factories.TaskFactory(
+            list=cls.list_2, name="Errands", description="milk and groceries"
+        )
+        factories.TaskFactory(list=cls.list, name="Walk the dog")
+        factories.TaskFactory(name="Groceries")
+
+        cls.url = reverse("task_list:task-search")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def search(self, q, **data):
+        response = self.client.get(self.url, {"q": q, **data})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def assertResults(self, response, tasks):
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [str(task.pk) for task in tasks],
+        )
+
+    def test_search(self):
+        # The name weighs more than the description
+        self.assertResults(
+            self.search("groceries"), [self.in_name, self.in_description]
+        )
+        self.assertResults(self.search("MILK, groceries!"), [self.in_description])
+        self.assertResults(self.search("milk walk"), [])
+        self.assertResults(self.search("!?"), [])
+
+    def test_prefix(self):
+        self.assertResults(self.search("gro"), [self.in_name, self.in_description])
+        self.assertResults(self.search("milk gro"), [self.in_description])
+        # Only the last word is a prefix
+        self.assertResults(self.search("mil groceries"), [])
+
+    def test_row(self):
+        response = self.search("walk")
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "list_id", "name", "description"}
+        )
+
+    def test_pages(self):
+        response = self.search("groceries", limit=1)
+        self.assertResults(response, [self.in_name])
+        response = self.client.get(response.data["next"])
+        self.assertResults(response, [self.in_description])
+        self.assertIsNone(response.data["next"])
+
+    def test_missing_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fuzzy(self):
+        if not has_extension("pg_trgm"):
+            self.skipTest("pg_trgm is not installed")
+        self.assertResults(self.search("grocereis"), [self.in_name])
@@ -0,0 +1,111 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from users.tests.factories import UserFactory
+from utils.db import has_extension
+
+from .. import models
+from . import factories
+
+
+class IndexTests(APITestCase):
+    """
+    Asserts that the collection pages are read in index order without a sort step
+
+    The tables are tiny in tests so sequential and bitmap scans are disabled to make
+    the planner show the plan it would pick on a big table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user)
+        factories.TaskFactory.create_batch(3, list=cls.list)
+        factories.ListFactory.create_batch(3)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    def get_page_plans(self, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data)
+
+        plans = []
+        for query in queries.captured_queries:
+            if "ORDER BY" not in query["sql"]:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {query['sql']}")
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def assertOrderedIndexScan(self, plans, index_name):
+        for plan in plans:
+            self.assertIn(index_name, plan)
+            self.assertNotIn("Sort", plan)
+
+    def test_list_pages(self):
+        url = reverse("task_list:list-list")
+        for data in ({}, {"offset": 1}, {"cursor": ""}):
+            plans = self.get_page_plans(url, data)
+            self.assertOrderedIndexScan(plans, "list_user_created_at_idx")
+
+    def test_task_pages(self):
+        url = reverse("task_list:task-list", kwargs={"pk": self.list.pk})
+        for data in ({}, {"offset": 1}, {"cursor": ""}):
+            plans = self.get_page_plans(url, data)
+            self.assertOrderedIndexScan(plans, "task_list_created_at_idx")
+
+    def test_sync_pages(self):
+        # Read in updated_at order from the index, only rows with the same updated_at
+        # are sorted by id
+        url = reverse("task_list:sync")
+        for data in ({}, {"since": "2020-01-01T00:00:00Z"}):
+            list_plan, task_plan = self.get_page_plans(url, data)
+            for plan, index_name in (
+                (list_plan, "list_user_updated_at_idx"),
+                (task_plan, "task_user_updated_at_idx"),
+            ):
+                self.assertIn(index_name, plan)
+                self.assertIn("Presorted Key: ", plan)
+                self.assertNotRegex(plan, r"(?m)^\W*Sort  \(")
+
+    def test_of_user(self):
+        # The lists being deleted are hashed once, not joined to every task
+        plan = models.Task.objects.of_user(self.user).explain()
+        self.assertIn("hashed SubPlan", plan)
+        self.assertNotIn("Join", plan)
+
+    def test_search(self):
+        if has_extension("btree_gin"):
+            self.skipTest("btree_gin is installed")
+        # On a table this small the tasks are read in full from another index and
+        # filtered, this checks that the search condition can use its index
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_bitmapscan = on")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+        plan = models.Task.objects.search("task").explain()
+        self.assertIn("task_search_vector_idx", plan)
+
+    def test_search_by_user(self):
+        if not has_extension("btree_gin"):
+            self.skipTest("btree_gin is not installed")
+        # On a table this small the user's few tasks would be read from the other
+        # indexes on user_id, dropped here until the test's transaction rolls back.
+        # This checks that the user and the search condition are both matched in the
+        # index, so a search doesn't read the matches of every user.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_bitmapscan = on")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute("DROP INDEX task_user_idx, task_user_updated_at_idx")
+        plan = models.Task.objects.of_user(self.user).search("task").explain()
+        self.assertIn("task_user_search_vector_idx", plan)
+        self.assertRegex(
+            plan, r"Index Cond: \(\(user_id = .+\) AND \(search_vector @@ .+\)\)"
+        )
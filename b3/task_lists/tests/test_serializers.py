@@ -14,6 +14,8 @@ class ListSerializerTests(SerializerTestCase):
         read_fields = {
             "id",
             "name",
+            "task_count",
+            "updated_at",
         }
         self.assertReadFieldsSetEqual(read_fields)
 
@@ -53,3 +55,30 @@ class TaskCreateSerializerTests(SerializerTestCase):
             "name",
         }
         self.assertReadFieldsSetEqual(read_fields)
+
+
+class TaskBulkUpdateSerializerTests(SerializerTestCase):
+    serializer_class = serializers.TaskBulkUpdateSerializer
+
+    def test_key(self):
+        write_fields = {
+            "id",
+            "description",
+            "name",
+        }
+        self.assertWriteFieldsSetEqual(write_fields)
+        self.assertWriteFieldsSetEqual({"id"}, required_only=True)
+        read_fields = {
+            "id",
+            "description",
+            "name",
+        }
+        self.assertReadFieldsSetEqual(read_fields)
+
+
+class TaskBulkDeleteSerializerTests(SerializerTestCase):
+    serializer_class = serializers.TaskBulkDeleteSerializer
+
+    def test_key(self):
+        self.assertWriteFieldsSetEqual({"ids"})
+        self.assertReadFieldsSetEqual({"ids"})
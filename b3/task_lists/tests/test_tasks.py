@@ -0,0 +1,70 @@
+from unittest.mock import call, patch
+
+from django.test import TestCase, override_settings
+
+from users.tests.factories import UserFactory
+from utils.models import delete_in_chunks
+
+from .. import models, tasks
+from . import factories
+
+
+@override_settings(DELETE_CHUNK_SIZE=2)
+class PurgeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list = factories.ListFactory()
+        factories.TaskFactory.create_batch(5, list=cls.list)
+        cls.other_task = factories.TaskFactory(list__user=cls.list.user)
+
+    def test_delete_in_chunks(self):
+        chunks = []
+        # Savepoint, delete, release for each chunk
+        with self.assertNumQueries(9):
+            deleted = delete_in_chunks(
+                models.Task.objects.filter(list=self.list), chunks.append
+            )
+        self.assertEqual(deleted, 5)
+        self.assertEqual(chunks, [2, 2, 1])
+        self.assertTrue(models.Task.objects.filter(pk=self.other_task.pk).exists())
+
+    def test_purge(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks.delete_list(self.list)
+
+        self.assertFalse(models.List.all_objects.filter(pk=self.list.pk).exists())
+        self.assertEqual(models.Task.objects.count(), 1)
+
+    def test_progress(self):
+        tasks.delete_list(self.list)
+        with patch.object(tasks.purge_list, "update_state") as update_state:
+            tasks.purge_list(self.list.pk)
+        self.assertEqual(
+            update_state.call_args_list,
+            [
+                call(state="PROGRESS", meta={"deleted": deleted})
+                for deleted in (2, 4, 5)
+            ],
+        )
+
+    def test_not_deleted(self):
+        tasks.purge_list(self.list.pk)
+        self.assertTrue(models.List.objects.filter(pk=self.list.pk).exists())
+        self.assertEqual(models.Task.objects.count(), 6)
+
+
+class HiddenListTests(TestCase):
+    def test_of_user(self):
+        user = UserFactory()
+        task = factories.TaskFactory(list__user=user, name="hidden")
+        visible = factories.TaskFactory(list__user=user, name="visible")
+        factories.TaskFactory(name="other")
+        tasks.delete_list(task.list)
+
+        self.assertEqual(models.List.objects.filter(user=user).count(), 1)
+        tasks_of_user = models.Task.objects.of_user(user)
+        self.assertEqual(list(tasks_of_user), [visible])
+        self.assertFalse(tasks_of_user.search("hidden").exists())
+        # The default manager doesn't join the lists
+        self.assertTrue(models.Task.objects.filter(pk=task.pk).exists())
+        self.assertNotIn("JOIN", str(models.Task.objects.all().query))
@@ -0,0 +1,10 @@
+from django.urls import include, path
+
+from ..urls import async_urlpatterns
+
+urlpatterns = [
+    path(
+        "task-list/",
+        include((async_urlpatterns, "task_lists"), namespace="task_list"),
+    ),
+]
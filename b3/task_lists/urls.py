@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
-from . import views
+from . import async_views, views
 
 app_name = "task_list"
 
@@ -9,8 +10,9 @@ router = routers.DefaultRouter()
 router.register("list", views.ListViewSet, basename="list")
 
 
-urlpatterns = [
+sync_urlpatterns = [
     path("", include(router.urls)),
+    path("export/", views.ExportView.as_view(), name="export"),
     path(
         "list/<uuid:pk>/task/<uuid:task_id>/",
         views.TaskDetailView.as_view(),
@@ -22,3 +24,36 @@ urlpatterns = [
         name="task-list",
     ),
 ]
+
+# Served instead of the above when running under ASGI, see b3/asgi.py
+async_urlpatterns = [
+    path("export/", async_views.ExportView.as_view(), name="export"),
+    path("list/", async_views.ListView.as_view(), name="list-list"),
+    path("list/<uuid:pk>/", async_views.ListDetailView.as_view(), name="list-detail"),
+    path(
+        "list/<uuid:pk>/copy/",
+        views.ListViewSet.as_view({"post": "copy"}, **views.ListViewSet.copy.kwargs),
+        name="list-copy",
+    ),
+    path(
+        "list/<uuid:pk>/task/<uuid:task_id>/",
+        async_views.TaskDetailView.as_view(),
+        name="task-detail",
+    ),
+    path(
+        "list/<uuid:pk>/task/",
+        async_views.TaskView.as_view(),
+        name="task-list",
+    ),
+    path("changes/", async_views.ChangeStreamView.as_view(), name="changes"),
+]
+
+urlpatterns = [
+    path("sync/", views.SyncView.as_view(), name="sync"),
+    path("task/search/", views.TaskSearchView.as_view(), name="task-search"),
+    path(
+        "list/<uuid:pk>/task/bulk/",
+        views.TaskBulkView.as_view(),
+        name="task-bulk",
+    ),
+] + (async_urlpatterns if settings.ASYNC_API else sync_urlpatterns)
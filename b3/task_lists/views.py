@@ -1,42 +1,133 @@
-from django.shortcuts import get_object_or_404
-from rest_framework import generics, viewsets
+import datetime
+
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, status, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from utils.idempotency import IdempotentCreateMixin
+from utils.pagination import (
+    OptionalKeysetPagination,
+    RankedKeysetPagination,
+    SyncPagination,
+)
+from utils.serializers import get_values_plan
+from utils.views import ConditionalRequestMixin, ValuesListMixin
+
+from . import exports, models, serializers, tasks
 
-from . import models, serializers
 
+class ListOwnerMixin:
+    def check_list_owner(self):
+        is_list_owner = models.List.objects.filter(
+            pk=self.kwargs["pk"],
+            user=self.request.user,
+        ).exists()
+        if not is_list_owner:
+            raise Http404
 
-class ListViewSet(viewsets.ModelViewSet):
+
+class ListViewSet(
+    IdempotentCreateMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = serializers.ListSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = OptionalKeysetPagination
 
     def get_queryset(self):
         return models.List.objects.filter(user=self.request.user).order_by(
-            "-created_at"
+            "-created_at", "-id"
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        models.Tombstone.objects.record(
+            self.request.user, models.Tombstone.ObjectType.LIST, [instance.pk]
+        )
+        tasks.delete_list(instance)
+
+    @action(
+        detail=True, methods=["post"], serializer_class=serializers.ListCopySerializer
+    )
+    def copy(self, request, *args, **kwargs):
+        """
+        Copies the list with all its tasks, named `name` or like the list
+        """
+        instance = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        copy = models.List.objects.copy(
+            instance, serializer.validated_data.get("name", instance.name)
+        )
+        return Response(
+            serializers.ListSerializer(copy).data, status=status.HTTP_201_CREATED
         )
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(ConditionalRequestMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = serializers.TaskSerializer
     permission_classes = (IsAuthenticated,)
+    lookup_url_kwarg = "task_id"
 
     def get_serializer_context(self):
         return {
             "list_id": self.kwargs["pk"],
-            "task_id": self.kwargs["task_id"],
             **super().get_serializer_context(),
         }
 
-    def get_object(self):
-        return get_object_or_404(
-            models.Task.objects,
-            list__user=self.request.user,
-            pk=self.kwargs["task_id"],
+    def get_queryset(self):
+        return models.Task.objects.of_user(self.request.user)
+
+    def perform_update(self, serializer):
+        if serializer.instance.list_id != self.kwargs["pk"]:
+            self.perform_move(serializer)
+        else:
+            super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_move(self, serializer):
+        # The list the task is moved from is read again under a lock, as a concurrent
+        # move could have changed it
+        previous_list_id = (
+            models.Task.objects.select_for_update()
+            .filter(pk=serializer.instance.pk)
+            .values_list("list_id", flat=True)
+            .first()
+        )
+        if previous_list_id is None:
+            raise Http404
+        super().perform_update(serializer)
+        if previous_list_id != serializer.instance.list_id:
+            models.List.objects.count_tasks(
+                {previous_list_id: -1, serializer.instance.list_id: 1}
+            )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        models.Tombstone.objects.record(
+            self.request.user, models.Tombstone.ObjectType.TASK, [instance.pk]
         )
+        deleted, _ = instance.delete()
+        models.List.objects.count_tasks({instance.list_id: -deleted})
 
 
-class TaskView(generics.ListCreateAPIView):
+class TaskView(
+    IdempotentCreateMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    ListOwnerMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = serializers.TaskCreateSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = OptionalKeysetPagination
 
     def get_serializer_context(self):
         return {
@@ -45,7 +136,234 @@ class TaskView(generics.ListCreateAPIView):
         }
 
     def get_queryset(self):
-        return models.Task.objects.filter(
-            list=self.kwargs["pk"],
-            list__user=self.request.user,
-        ).order_by("-created_at")
+        return (
+            models.Task.objects.of_user(self.request.user)
+            .filter(list=self.kwargs["pk"])
+            .order_by("-created_at", "-id")
+        )
+
+    def perform_create(self, serializer):
+        self.check_list_owner()
+        with transaction.atomic():
+            serializer.save()
+            models.List.objects.count_tasks({self.kwargs["pk"]: 1})
+
+
+class TaskSearchView(ValuesListMixin, generics.ListAPIView):
+    """
+    get: Searches the names and descriptions of all tasks of the user for `q`, best
+    matches first
+    """
+
+    serializer_class = serializers.TaskCreateSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = RankedKeysetPagination
+
+    def get_queryset(self):
+        query = serializers.SearchQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return models.Task.objects.of_user(self.request.user).search(
+            query.validated_data["q"]
+        )
+
+
+class TaskBulkView(ListOwnerMixin, generics.GenericAPIView):
+    """
+    post: Creates tasks in the list from an array of tasks
+    patch: Updates tasks in the list from an array of tasks with their `id`
+    delete: Deletes the tasks in the list with the given `ids`
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get_serializer_class(self):
+        if self.request.method == "PATCH":
+            return serializers.TaskBulkUpdateSerializer
+        if self.request.method == "DELETE":
+            return serializers.TaskBulkDeleteSerializer
+        return serializers.TaskCreateSerializer
+
+    def get_queryset(self):
+        return models.Task.objects.of_user(self.request.user).filter(
+            list=self.kwargs["pk"]
+        )
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=serializers.BULK_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        self.check_list_owner()
+        with transaction.atomic():
+            created = serializer.save(list_id=self.kwargs["pk"], user=request.user)
+            models.List.objects.count_tasks({self.kwargs["pk"]: len(created)})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=serializers.BULK_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        tasks = self.get_queryset().in_bulk([item["id"] for item in items])
+        errors = []
+        seen = set()
+        for item in items:
+            if item["id"] not in tasks:
+                errors.append({"id": ["Task not found in this list."]})
+            elif item["id"] in seen:
+                errors.append({"id": ["Duplicate id."]})
+            else:
+                errors.append({})
+            seen.add(item["id"])
+        if any(errors):
+            raise ValidationError(errors)
+
+        # bulk_update() skips auto_now so updated_at is set here
+        now = timezone.now()
+        for item in items:
+            task = tasks[item["id"]]
+            for attr, value in item.items():
+                setattr(task, attr, value)
+            task.updated_at = now
+
+        with transaction.atomic():
+            models.Task.objects.bulk_update(
+                tasks.values(),
+                fields=("name", "description", "updated_at"),
+                batch_size=serializers.BULK_BATCH_SIZE,
+            )
+
+        updated = [tasks[item["id"]] for item in items]
+        return Response(serializers.TaskCreateSerializer(updated, many=True).data)
+
+    def delete(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        tasks = self.get_queryset().filter(pk__in=ids)
+        with transaction.atomic():
+            found = set(tasks.values_list("pk", flat=True))
+            # Reported like the errors of PATCH, nothing is deleted if there are any
+            errors = {}
+            seen = set()
+            for index, task_id in enumerate(ids):
+                if task_id not in found:
+                    errors[index] = ["Task not found in this list."]
+                elif task_id in seen:
+                    errors[index] = ["Duplicate id."]
+                seen.add(task_id)
+            if errors:
+                raise ValidationError({"ids": errors})
+
+            models.Tombstone.objects.record(
+                request.user, models.Tombstone.ObjectType.TASK, ids
+            )
+            _, deleted = tasks.delete()
+            models.List.objects.count_tasks(
+                {self.kwargs["pk"]: -deleted.get(models.Task._meta.label, 0)}
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ExportMixin:
+    # File format: (function returning the content of a user's export, content type)
+    file_formats = {
+        "ndjson": (exports.to_ndjson, "application/x-ndjson"),
+        "csv": (exports.to_csv, "text/csv"),
+    }
+
+    def get_export_response(self, request):
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in self.file_formats:
+            raise ValidationError(
+                {"file_format": [f"Must be one of: {', '.join(self.file_formats)}."]}
+            )
+
+        export, content_type = self.file_formats[file_format]
+        response = StreamingHttpResponse(
+            export(request.user), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="b3-export.{file_format}"'
+        )
+        return response
+
+
+class ExportView(ExportMixin, views.APIView):
+    """
+    get: Streams all lists and tasks of the user as NDJSON, or as CSV with
+    `?file_format=csv`
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        return self.get_export_response(request)
+
+
+class SyncView(views.APIView):
+    """
+    get: Returns the lists and tasks changed after `since`, the ids of the ones
+    deleted after it and a `watermark` to send as `since` on the next sync. Leave out
+    `since` for a full sync. The tasks of a deleted list are deleted with it.
+
+    The changes come in pages, oldest first, follow `next` until it's null. Every
+    page has the same `watermark`, deletions are all on the first one.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    pagination_class = SyncPagination
+    # updated_at is stamped before the transaction commits, so a row can become
+    # visible after a sync that started later than its updated_at. Handing out a
+    # watermark this far back catches those rows, some rows are sent twice instead.
+    watermark_overlap = datetime.timedelta(seconds=5)
+
+    def get(self, request, *args, **kwargs):
+        query = serializers.SyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data.get("since")
+
+        lists = models.List.objects.filter(user=request.user)
+        tasks = models.Task.objects.of_user(request.user)
+        if since is not None:
+            lists = lists.filter(updated_at__gt=since)
+            tasks = tasks.filter(updated_at__gt=since)
+        list_plan = get_values_plan(serializers.ListSerializer)
+        task_plan = get_values_plan(serializers.TaskCreateSerializer)
+
+        paginator = self.pagination_class()
+        pages = paginator.paginate_querysets(
+            {
+                "lists": list_plan.values(lists, paginator),
+                "tasks": task_plan.values(tasks, paginator),
+            },
+            request,
+        )
+        deleted = {
+            models.Tombstone.ObjectType.LIST: [],
+            models.Tombstone.ObjectType.TASK: [],
+        }
+        if since is not None and paginator.is_first_page:
+            tombstones = models.Tombstone.objects.filter(
+                user=request.user,
+                deleted_at__gt=since,
+                deleted_at__lte=paginator.until,
+            ).values_list("object_type", "object_id")
+            for object_type, object_id in tombstones:
+                deleted[object_type].append(object_id)
+
+        return Response(
+            {
+                "watermark": paginator.until - self.watermark_overlap,
+                "next": paginator.get_next_link(),
+                "lists": list_plan.render(pages["lists"]),
+                "tasks": task_plan.render(pages["tasks"]),
+                "deleted": {
+                    "lists": deleted[models.Tombstone.ObjectType.LIST],
+                    "tasks": deleted[models.Tombstone.ObjectType.TASK],
+                },
+            }
+        )
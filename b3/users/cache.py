@@ -0,0 +1,38 @@
+from django.core.cache import cache
+
+USER_TIMEOUT = 60
+
+
+def get_user_key(user_id):
+    return f"users:user:{user_id}"
+
+
+def get_device_key(persistent_id):
+    return f"users:otp-device:{persistent_id}"
+
+
+def get_user(user_id):
+    return cache.get(get_user_key(user_id))
+
+
+def set_user(user):
+    cache.set(get_user_key(user.pk), user, USER_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    cache.delete(get_user_key(user_id))
+
+
+def get_device(persistent_id, fetch):
+    """
+    Returns the OTP device with the persistent id, calling `fetch` on a miss
+    """
+    entry = cache.get(get_device_key(persistent_id))
+    if entry is None:
+        entry = {"device": fetch(persistent_id)}
+        cache.set(get_device_key(persistent_id), entry, USER_TIMEOUT)
+    return entry["device"]
+
+
+def invalidate_device(persistent_id):
+    cache.delete(get_device_key(persistent_id))
@@ -0,0 +1,37 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from task_lists.models import List
+from task_lists.tasks import purge_list
+from users.models import User
+from users.tasks import purge_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues the purge of lists and accounts that were deleted but are still in "
+        "the database, e.g. because the broker was down"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=60,
+            help="Only deletions at least this many minutes old (default: 60)",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(minutes=options["older_than"])
+        users = User.objects.filter(deleted_at__lt=before).values_list("pk", flat=True)
+        for user_id in users:
+            purge_user.delay(user_id)
+        # The lists of deleted accounts are purged with them
+        lists = List.all_objects.filter(
+            deleted_at__lt=before, user__deleted_at=None
+        ).values_list("pk", flat=True)
+        for list_id in lists:
+            purge_list.delay(list_id)
+        self.stdout.write(f"Queued {len(users)} accounts and {len(lists)} lists")
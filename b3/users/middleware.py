@@ -0,0 +1,69 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import middleware
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from django_otp import middleware as otp_middleware
+
+from . import cache
+
+
+def get_user(request):
+    """
+    Returns the session's user from the cache if the session auth hash still matches
+
+    Anything else, like a first request or a changed password, goes through Django,
+    which verifies the session in the database, and a user found there is cached.
+    Saving a user clears the cached copy, see signals.py.
+    """
+    if hasattr(request, "_cached_user"):
+        return request._cached_user
+
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    user = None
+    if (
+        user_id
+        and session_hash
+        and session.get(auth.BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS
+    ):
+        user = cache.get_user(user_id)
+    if user is None or not constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    ):
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set_user(user)
+
+    request._cached_user = user
+    return user
+
+
+async def auser(request):
+    if not hasattr(request, "_acached_user"):
+        request._acached_user = await sync_to_async(get_user)(request)
+    return request._acached_user
+
+
+class AuthenticationMiddleware(middleware.AuthenticationMiddleware):
+    """
+    Django's AuthenticationMiddleware with the user cached in Redis
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = functools.partial(auser, request)
+
+
+class OTPMiddleware(otp_middleware.OTPMiddleware):
+    """
+    django_otp's OTPMiddleware with the verified device cached in Redis
+    """
+
+    def _device_from_persistent_id(self, persistent_id):
+        return cache.get_device(persistent_id, super()._device_from_persistent_id)
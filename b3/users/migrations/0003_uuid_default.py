@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_deleted_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="id",
+            field=models.UUIDField(
+                default=utils.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
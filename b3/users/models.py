@@ -41,7 +41,24 @@ class UserManager(BaseUserManager):
         return email.lower()
 
     def get_by_natural_key(self, email):
-        return self.get(**{self.model.USERNAME_FIELD: email.lower()})
+        return self.get(**{f"{self.model.USERNAME_FIELD}__iexact": email})
+
+
+class LowerExact(models.Lookup):
+    """
+    `email__iexact` as LOWER(email) = LOWER(value), which the index of the
+    email_unique_case_insensitive constraint serves
+
+    Django's iexact compares UPPER() of both sides on PostgreSQL, which no index
+    matches, so every lookup by email would scan the table.
+    """
+
+    lookup_name = "iexact"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"LOWER({lhs}) = LOWER({rhs})", (*lhs_params, *rhs_params)
 
 
 class User(UUIDModel, TimestampedModel, AbstractBaseUser, PermissionsMixin):
@@ -60,6 +77,8 @@ class User(UUIDModel, TimestampedModel, AbstractBaseUser, PermissionsMixin):
             "Unselect this instead of deleting accounts."
         ),
     )
+    # Set when the user deletes the account, which is purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     USERNAME_FIELD = "email"
     objects = UserManager()
@@ -81,3 +100,8 @@ class User(UUIDModel, TimestampedModel, AbstractBaseUser, PermissionsMixin):
     def send_password_reset_email(self):
         # token = default_token_generator.make_token(self)
         raise NotImplementedError
+
+
+# All lookups by email go through email__iexact: login (get_by_natural_key), the
+# UniqueValidators of registration and profile updates, and the password reset
+User._meta.get_field("email").register_lookup(LowerExact)
@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django_otp.models import Device
+
+from . import cache, models
+
+
+@receiver((post_save, post_delete), sender=models.User)
+def invalidate_user(sender, instance, **kwargs):
+    # Again after the commit, a request could have cached the old row in between
+    cache.invalidate_user(instance.pk)
+    transaction.on_commit(lambda: cache.invalidate_user(instance.pk))
+
+
+def invalidate_device(sender, instance, **kwargs):
+    cache.invalidate_device(instance.persistent_id)
+    transaction.on_commit(lambda: cache.invalidate_device(instance.persistent_id))
+
+
+# Only to the device models, a receiver for every model would keep Django from
+# deleting rows without loading them first
+for model in apps.get_models():
+    if issubclass(model, Device):
+        post_save.connect(invalidate_device, sender=model)
+        post_delete.connect(invalidate_device, sender=model)
@@ -1,4 +1,10 @@
+from django.db import transaction
+from django.utils import timezone
+
 from b3.celery import app
+from task_lists.models import List, Tombstone
+from task_lists.tasks import ProgressReporter, purge_lists
+from utils.models import delete_in_chunks
 
 from . import models
 
@@ -7,3 +13,28 @@ from . import models
 def send_reset_password_email(user_pk):
     user = models.User.objects.get(pk=user_pk)
     user.send_password_reset_email()
+
+
+def delete_user(user):
+    """
+    Deactivates the account, which logs it out everywhere, and purges it in the
+    background
+    """
+    user.deleted_at = timezone.now()
+    user.is_active = False
+    user.save(update_fields=["deleted_at", "is_active"])
+    transaction.on_commit(lambda: purge_user.delay(user.pk))
+
+
+@app.task(bind=True)
+def purge_user(self, user_id):
+    """
+    Deletes an account deleted with delete_user() and all its data, reporting the
+    progress
+    """
+    if not models.User.objects.filter(pk=user_id, deleted_at__isnull=False).exists():
+        return
+    report = ProgressReporter(self)
+    purge_lists(List.all_objects.filter(user=user_id), report)
+    delete_in_chunks(Tombstone.objects.filter(user=user_id), report)
+    models.User.objects.filter(pk=user_id).delete()
@@ -1,10 +1,14 @@
 from unittest.mock import patch
 
 from django.contrib.auth.tokens import default_token_generator
+from django.test import override_settings
+from django_redis import get_redis_connection
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
+from utils.tests.test_throttling import REDIS_CACHES
+
 from .. import models, serializers, views
 from . import factories
 
@@ -101,8 +105,17 @@ class UserMeViewTests(APITestCase):
         self.user.set_password(password)
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        response = self.client.delete(self.url, data={"password": password})
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(self.url, data={"password": password})
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        # Deactivated until the purge runs
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertIsNotNone(self.user.deleted_at)
+
+        for callback in callbacks:
+            callback()
         with self.assertRaises(models.User.DoesNotExist):
             self.user.refresh_from_db()
 
@@ -158,6 +171,43 @@ class LoginViewTests(APITestCase):
         )
 
 
+@override_settings(
+    CACHES=REDIS_CACHES,
+    REST_FRAMEWORK={
+        "DEFAULT_THROTTLE_RATES": {"login-ip": "10/15m", "login-email": "2/15m"}
+    },
+)
+@patch.object(
+    views.LoginView,
+    "throttle_classes",
+    (views.LoginIPThrottle, views.LoginEmailThrottle),
+)
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.addCleanup(self.delete_keys)
+
+    def delete_keys(self):
+        client = get_redis_connection()
+        for key in client.scan_iter("throttle:login-*"):
+            client.delete(key)
+
+    def test_email(self):
+        url = reverse("users:login")
+        data = {"email": self.user.email, "password": "wrongpassword"}
+        for i in range(2):
+            response = self.client.post(url, data, REMOTE_ADDR=f"10.0.0.{i}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, data, REMOTE_ADDR="10.0.0.3")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "450")
+
+        data["email"] = "someone-else@example.com"
+        response = self.client.post(url, data, REMOTE_ADDR="10.0.0.3")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class LogoutViewTests(APITestCase):
     def test_logout(self):
         user = factories.UserFactory()
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from . import factories
+
+
+class EmailIndexTests(APITestCase):
+    """
+    Asserts that every lookup by email is served by the LOWER(email) index of the
+    email_unique_case_insensitive constraint
+
+    The table is tiny in tests so sequential scans are disabled to make the planner
+    show the plan it would pick on a big table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = factories.UserFactory(email="moiraine@example.com")
+        factories.UserFactory.create_batch(3)
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def get_email_plans(self, method, url, data, status_code):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(response.status_code, status_code)
+
+        plans = []
+        for query in queries.captured_queries:
+            sql = query["sql"]
+            if (
+                not sql.startswith("SELECT")
+                or '"email"' not in sql.partition("WHERE")[2]
+            ):
+                continue
+            self.assertNotIn("UPPER(", sql)
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {sql}")
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def assertEmailIndexScan(self, plans):
+        for plan in plans:
+            self.assertIn("email_unique_case_insensitive", plan)
+
+    def test_login(self):
+        url = reverse("users:login")
+        data = {"email": "Moiraine@Example.com", "password": "test1234"}
+        plans = self.get_email_plans("post", url, data, status.HTTP_204_NO_CONTENT)
+        self.assertEmailIndexScan(plans)
+
+    def test_register(self):
+        url = reverse("users:register")
+        data = {"email": "MOIRAINE@example.com", "password": "Aes Sedai 1000"}
+        plans = self.get_email_plans("post", url, data, status.HTTP_400_BAD_REQUEST)
+        self.assertEmailIndexScan(plans)
+
+    @patch("users.models.User.send_password_reset_email", autospec=True)
+    def test_reset_password(self, send_email_mock):
+        url = reverse("users:reset-password")
+        data = {"email": "MOIRAINE@EXAMPLE.COM"}
+        plans = self.get_email_plans("post", url, data, status.HTTP_204_NO_CONTENT)
+        self.assertEmailIndexScan(plans)
+
+    def test_update_email(self):
+        other_user = factories.UserFactory()
+        self.client.force_authenticate(other_user)
+        url = reverse("users:user-me")
+        data = {"email": "Moiraine@example.com"}
+        plans = self.get_email_plans("patch", url, data, status.HTTP_400_BAD_REQUEST)
+        self.assertEmailIndexScan(plans)
@@ -0,0 +1,90 @@
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django_otp import DEVICE_ID_SESSION_KEY
+from django_otp.plugins.otp_static.models import StaticDevice
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from .. import middleware
+from . import factories
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+)
+class CachedAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = factories.UserFactory(first_name="Moiraine")
+        self.client.force_login(self.user)
+        self.url = reverse("users:user-me")
+
+    def test_cached(self):
+        # The user, logging in cached the session
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.user.email)
+
+    def test_saved(self):
+        self.client.get(self.url)
+        self.user.first_name = "Cadsuane"
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["first_name"], "Cadsuane")
+
+    def test_password_changed(self):
+        self.client.get(self.url)
+        self.user.set_password("supersecret34134#")
+        self.user.save()
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_deactivated(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedOTPDeviceTests(TestCase):
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.device = StaticDevice.objects.create(user=self.user, name="backup")
+
+    def get_user(self):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session[DEVICE_ID_SESSION_KEY] = self.device.persistent_id
+        request.user = self.user
+        return middleware.OTPMiddleware(lambda request: HttpResponse())._verify_user(
+            request, self.user
+        )
+
+    def test_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_user().otp_device, self.device)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_user().otp_device, self.device)
+
+    def test_deleted(self):
+        self.get_user()
+        self.device.delete()
+        self.assertFalse(self.get_user().is_verified())
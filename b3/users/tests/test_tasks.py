@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from task_lists import models as task_list_models
+from task_lists.tests import factories as task_list_factories
+
+from .. import models, tasks
+from . import factories
+
+
+@override_settings(DELETE_CHUNK_SIZE=2)
+class PurgeUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = factories.UserFactory()
+        for _ in range(2):
+            task_list_factories.TaskFactory.create_batch(
+                3, list=task_list_factories.ListFactory(user=cls.user)
+            )
+        task_list_models.Tombstone.objects.create(
+            user=cls.user, object_type="task", object_id=cls.user.pk
+        )
+        cls.other_task = task_list_factories.TaskFactory()
+
+    def test_purge(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks.delete_user(self.user)
+
+        self.assertFalse(models.User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(task_list_models.List.all_objects.count(), 1)
+        self.assertEqual(task_list_models.Task.objects.count(), 1)
+        self.assertFalse(task_list_models.Tombstone.objects.exists())
+
+    def test_not_deleted(self):
+        tasks.purge_user(self.user.pk)
+        self.assertTrue(models.User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(task_list_models.Task.objects.count(), 7)
+
+    def test_purge_deleted_command(self):
+        models.User.objects.filter(pk=self.user.pk).update(
+            deleted_at=timezone.now() - timezone.timedelta(hours=2)
+        )
+        list_ = self.other_task.list
+        list_.deleted_at = timezone.now()
+        list_.save()
+
+        out = StringIO()
+        call_command("purge_deleted", stdout=out)
+        self.assertEqual(out.getvalue(), "Queued 1 accounts and 0 lists\n")
+        self.assertFalse(models.User.objects.filter(pk=self.user.pk).exists())
+
+        call_command("purge_deleted", older_than=0, stdout=out)
+        self.assertFalse(task_list_models.Task.objects.exists())
@@ -1,4 +1,5 @@
 from django.contrib.auth import login, logout
+from django.db import transaction
 from django.middleware.csrf import get_token
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
@@ -8,15 +9,39 @@ from rest_framework import generics, status, views
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
+
+from utils.decorators import compress_exempt
+from utils.idempotency import IdempotentCreateMixin
+from utils.throttling import EmailRateThrottle, IPRateThrottle
 
 from . import models, permissions, serializers, tasks
 
 
-class RegistrationView(generics.CreateAPIView):
+class LoginIPThrottle(IPRateThrottle):
+    scope = "login-ip"
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = "login-email"
+
+
+class RegistrationIPThrottle(IPRateThrottle):
+    scope = "register-ip"
+
+
+class ResetPasswordIPThrottle(IPRateThrottle):
+    scope = "reset-password-ip"
+
+
+class ResetPasswordEmailThrottle(EmailRateThrottle):
+    scope = "reset-password-email"
+
+
+class RegistrationView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = serializers.RegistrationSerializer
     authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (RegistrationIPThrottle,)
 
     @method_decorator(sensitive_post_parameters())
     @method_decorator(csrf_protect)
@@ -28,11 +53,21 @@ class RegistrationView(generics.CreateAPIView):
         user = serializer.save()
         login(self.request, user)
 
+    def perform_replay(self, request):
+        # The replayed response has no session cookie, the client is logged in again
+        # with the credentials it registered with, as the key's fingerprint matched
+        serializer = serializers.LoginSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        if serializer.is_valid():
+            login(request, serializer.validated_data["user"])
+
 
 class ResetPasswordView(generics.GenericAPIView):
     serializer_class = serializers.ResetPasswordSerializer
     authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (ResetPasswordIPThrottle, ResetPasswordEmailThrottle)
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -83,14 +118,13 @@ class UserMeView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return self.request.user
 
-
-class LoginThrottle(AnonRateThrottle):
-    rate = "overriden/below"  # Needed but overriden by parse_rate()
-
-    def parse_rate(self, rate):
-        return 10, 60 * 15  # 10 requests per 15 minutes
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        tasks.delete_user(instance)
+        logout(self.request)
 
 
+@method_decorator(compress_exempt, name="dispatch")
 class CSRFAPIView(views.APIView):
     permission_classes = (AllowAny,)
 
@@ -106,7 +140,7 @@ class CSRFAPIView(views.APIView):
 class LoginView(generics.GenericAPIView):
     serializer_class = serializers.LoginSerializer
     permission_classes = (AllowAny,)
-    throttle_classes = (LoginThrottle,)
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -0,0 +1,210 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .idempotency import IdempotentRequest
+from .serializers import get_values_plan
+from .views import ResponseValidatorsMixin
+
+
+class AsyncGenericAPIView(ResponseValidatorsMixin, generics.GenericAPIView):
+    """
+    Async counterpart of DRF's generic views
+
+    DRF's dispatch() is sync, so this one awaits the async handlers. Everything
+    else is DRF's: authentication with its CSRF check, permissions, throttles and
+    content negotiation run in `initial()` in a thread, the request's data is parsed
+    by the parser matching its content type and errors go through the exception
+    handler, so clients can't tell these views from the sync ones. The handlers read
+    and write through the async ORM, and run what needs a transaction or queries
+    in serializer validation in a thread.
+
+    `asave()` bypasses the serializer's `save()`, pass what it would add as
+    keyword arguments. Updates and deletes with preconditions lock the row in a
+    thread, like ConditionalRequestMixin.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return await sync_to_async(super().options)(request, *args, **kwargs)
+
+    @property
+    def user(self):
+        return self.request.user
+
+    def get_lookup(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    async def aget_object(self):
+        try:
+            instance = await self.get_queryset().aget(**self.get_lookup())
+        except self.get_queryset().model.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    def get_locked_object(self):
+        """
+        get_object() locking the row and checking the preconditions, runs in a
+        thread in a transaction
+        """
+        try:
+            instance = self.get_queryset().select_for_update().get(**self.get_lookup())
+        except self.get_queryset().model.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        self.check_preconditions(instance)
+        return instance
+
+    async def alist(self):
+        queryset = self.get_queryset()
+        paginator = self.paginator
+        cursor = self.get_keyset_cursor(paginator)
+        if cursor is None:
+            state = await queryset.order_by().aaggregate(
+                last_updated=Max("updated_at"), count=Count("pk")
+            )
+            etag = self.get_collection_etag(state["last_updated"], state["count"])
+            response = get_conditional_response(self.request, etag=etag)
+            if response is not None:
+                return self.set_validators(response, etag)
+            paginator.known_count = state["count"]
+
+        plan = get_values_plan(self.serializer_class)
+        if plan is not None:
+            queryset = plan.values(queryset, paginator)
+        page = await paginator.apaginate_queryset(queryset, self.request, view=self)
+        if plan is not None:
+            data = plan.render(page)
+        else:
+            data = self.get_serializer(page, many=True).data
+        response = paginator.get_paginated_response(data)
+        if cursor is not None:
+            etag = self.get_page_etag(cursor, response.data)
+            response = get_conditional_response(self.request, etag=etag) or response
+        return self.set_validators(response, etag)
+
+    async def aretrieve(self):
+        instance = await self.aget_object()
+        etag, last_modified = self.get_object_validators(instance)
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self.set_validators(response, etag, last_modified)
+
+    async def acreate(self, **kwargs):
+        serializer = await self.avalidate(self.get_serializer(data=self.request.data))
+        await self.asave(serializer, **kwargs)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    async def aupdate(self, partial=False, **kwargs):
+        if self.has_preconditions():
+            serializer = await sync_to_async(self.update_locked)(partial, **kwargs)
+        else:
+            serializer = await self.avalidate(
+                self.get_serializer(
+                    await self.aget_object(), data=self.request.data, partial=partial
+                )
+            )
+            await self.asave(serializer, **kwargs)
+        return self.set_validators(
+            Response(serializer.data),
+            *self.get_object_validators(serializer.instance),
+        )
+
+    @transaction.atomic
+    def update_locked(self, partial, **kwargs):
+        serializer = self.get_serializer(
+            self.get_locked_object(), data=self.request.data, partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer, **kwargs)
+        return serializer
+
+    async def adestroy(self):
+        if self.has_preconditions():
+            await sync_to_async(self.destroy_locked)()
+        else:
+            await sync_to_async(self.perform_destroy)(await self.aget_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @transaction.atomic
+    def destroy_locked(self):
+        self.perform_destroy(self.get_locked_object())
+
+    def perform_update(self, serializer, **kwargs):
+        """
+        asave() of updates for update_locked(), runs in a thread
+        """
+        for attr, value in {**serializer.validated_data, **kwargs}.items():
+            setattr(serializer.instance, attr, value)
+        serializer.instance.save()
+
+    def perform_destroy(self, instance):
+        """
+        Runs in a thread so it can use a transaction
+        """
+        instance.delete()
+
+    async def aidempotent(self, handler):
+        """
+        Awaits `handler()`, idempotently for requests with an Idempotency-Key, see
+        utils.idempotency
+        """
+        idempotent = IdempotentRequest.from_request(self.request)
+        if idempotent is None:
+            return await handler()
+
+        async def rendered_handler():
+            response = await handler()
+            # Rendered here so the content can be stored
+            return self.finalize_response(self.request, response).render()
+
+        return await idempotent.arun(rendered_handler)
+
+    async def avalidate(self, serializer):
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        return serializer
+
+    async def asave(self, serializer, **kwargs):
+        data = {**serializer.validated_data, **kwargs}
+        if serializer.instance is None:
+            model = serializer.Meta.model
+            serializer.instance = await model.objects.acreate(**data)
+            return serializer.instance
+
+        instance = serializer.instance
+        for attr, value in data.items():
+            setattr(instance, attr, value)
+        await instance.asave()
+        return instance
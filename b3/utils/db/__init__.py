@@ -0,0 +1,18 @@
+import functools
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def has_extension(name, using=DEFAULT_DB_ALIAS):
+    """
+    Returns whether a Postgres extension is installed, checked once per process
+    """
+    connection = connections[using]
+    return _has_extension(name, using, connection.settings_dict["NAME"])
+
+
+@functools.cache
+def _has_extension(name, using, database):
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = %s", [name])
+        return cursor.fetchone() is not None
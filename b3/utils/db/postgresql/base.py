@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that can take its connections from psycopg's pool
+
+    Set `OPTIONS["pool"]` to True or to ConnectionPool arguments like `min_size`,
+    `max_size` and `timeout`, as with Django 5.1's own backend, which this can be
+    swapped for when upgrading. Connections are checked before they are handed out
+    and given back at the end of each request, so CONN_MAX_AGE must be 0.
+
+    Every DB_POOL_STATS_INTERVAL seconds the pool usage is logged, as a warning if
+    requests had to wait for a connection.
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        options = self.settings_dict["OPTIONS"].get("pool")
+        # Databases are created and dropped through a connection without a NAME
+        if not options or not self.settings_dict["NAME"]:
+            return None
+
+        # Pools run threads, which don't survive a fork, so one per process
+        key = self.get_pool_key()
+        with self._pools_lock:
+            if key not in self._pools:
+                if self.settings_dict["CONN_MAX_AGE"] != 0:
+                    raise ImproperlyConfigured(
+                        "Pooled connections can't be persistent, set CONN_MAX_AGE to 0."
+                    )
+                self._pools[key] = PoolWithStats(
+                    kwargs=self.get_connection_params(),
+                    check=ConnectionPool.check_connection,
+                    name=self.alias,
+                    open=False,
+                    **({} if options is True else options),
+                )
+            return self._pools[key]
+
+    def get_pool_key(self):
+        return (os.getpid(), self.alias, self.settings_dict["NAME"])
+
+    def close_pool(self):
+        pool = self.pool
+        if pool is not None:
+            self.close()
+            pool.close()
+            with self._pools_lock:
+                del self._pools[self.get_pool_key()]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        # What the parent does, with a connection from the pool
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = IsolationLevel.READ_COMMITTED
+        if "isolation_level" in options:
+            try:
+                self.isolation_level = IsolationLevel(options["isolation_level"])
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {options['isolation_level']} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+        pool.open()
+        connection = pool.getconn()
+        if "isolation_level" in options:
+            connection.isolation_level = self.isolation_level
+        pool.log_stats()
+        return connection
+
+    def _close(self):
+        pool = self.pool
+        if self.connection is None or pool is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        # It's back in the pool even when closed in a transaction
+        self.connection = None
+
+
+class PoolWithStats(ConnectionPool):
+    """
+    Logs `pop_stats()`, which resets the counters, at most once an interval
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_interval = getattr(settings, "DB_POOL_STATS_INTERVAL", 60)
+        self.stats_logged_at = time.monotonic()
+
+    def log_stats(self):
+        now = time.monotonic()
+        if now - self.stats_logged_at < self.stats_interval:
+            return
+        self.stats_logged_at = now
+
+        stats = self.pop_stats()
+        level = logging.WARNING if stats.get("requests_queued") else logging.INFO
+        logger.log(
+            level,
+            " ".join(f"{key}=%s" for key in stats),
+            *stats.values(),
+            extra={"db_pool": {"name": self.name, **stats}},
+        )
@@ -0,0 +1,24 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+
+def compress_exempt(view_func):
+    """
+    Marks the responses of a view to not be compressed by CompressionMiddleware
+    """
+    if iscoroutinefunction(view_func):
+
+        async def _view_wrapper(*args, **kwargs):
+            response = await view_func(*args, **kwargs)
+            response.compress_exempt = True
+            return response
+
+    else:
+
+        def _view_wrapper(*args, **kwargs):
+            response = view_func(*args, **kwargs)
+            response.compress_exempt = True
+            return response
+
+    return wraps(view_func)(_view_wrapper)
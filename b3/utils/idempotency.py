@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+import re
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import salted_hmac
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+logger = logging.getLogger(__name__)
+
+KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+# Deletes the lock only if it is still the one taken, not one taken after it expired
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+# Seconds a request holds the lock at most, in case its process dies
+LOCK_TIMEOUT = 30
+# Seconds a retry waits for the request holding the lock before giving up
+WAIT_TIMEOUT = 5
+POLL_INTERVAL = 0.05
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still being processed."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentRequest:
+    """
+    A request with an Idempotency-Key header, whose response is stored in Redis so
+    a retry with the same key gets it replayed instead of running the request again
+
+    Keys are per user, or per CSRF cookie for anonymous requests, which the views
+    that take them must check anyway. A retry must have the same method, path and
+    data as the request or it fails with 422. Only successful responses are stored,
+    for IDEMPOTENCY_TTL seconds, without their cookies. A lock makes concurrent
+    retries wait for the request that holds it and replay its response.
+
+    When Redis is down, or an anonymous request has no CSRF cookie, requests run as
+    if they had no key.
+    """
+
+    cache_alias = "default"
+
+    def __init__(self, request, key, client, scope):
+        self.client = client
+        self.key = f"idempotency:{scope}:{key}"
+        self.lock_key = f"{self.key}:lock"
+        self.token = uuid.uuid4().hex
+        self.fingerprint = salted_hmac(
+            "utils.idempotency",
+            json.dumps(
+                [request.method, request.path, request.data],
+                sort_keys=True,
+                default=str,
+            ),
+        ).hexdigest()
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Returns None for requests without an Idempotency-Key or without a Redis cache
+        """
+        key = request.META.get("HTTP_IDEMPOTENCY_KEY")
+        if key is None:
+            return None
+        if not KEY_PATTERN.match(key):
+            raise ValidationError(
+                {"Idempotency-Key": ["Must be 1 to 255 printable ASCII characters."]}
+            )
+        scope = cls.get_scope(request)
+        if scope is None:
+            return None
+        try:
+            client = get_redis_connection(cls.cache_alias)
+        except NotImplementedError:
+            # Not a Redis cache, like the DummyCache of the tests
+            return None
+        return cls(request, key, client, scope)
+
+    @staticmethod
+    def get_scope(request):
+        user = request.user
+        if user and user.is_authenticated:
+            return str(user.pk)
+        csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+        if not csrf_cookie:
+            return None
+        # Anonymous clients sharing an address don't share keys
+        digest = salted_hmac("utils.idempotency.scope", csrf_cookie).hexdigest()
+        return f"anonymous:{digest}"
+
+    def run(self, handler):
+        """
+        Returns the stored response, or the one of `handler()` and stores it
+        """
+        try:
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while not self.acquire():
+                response = self.replay()
+                if response is not None:
+                    return response
+                if time.monotonic() > deadline:
+                    raise IdempotencyKeyInUse
+                time.sleep(POLL_INTERVAL)
+        except RedisError:
+            logger.warning("Idempotency-Key lookup failed, running the request")
+            return handler()
+
+        try:
+            response = self.replay()
+            if response is None:
+                response = handler()
+                self.save(response)
+            return response
+        finally:
+            self.release()
+
+    async def arun(self, handler):
+        """
+        run() for async views, `handler` is a coroutine function
+        """
+        try:
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while not await sync_to_async(self.acquire)():
+                response = await sync_to_async(self.replay)()
+                if response is not None:
+                    return response
+                if time.monotonic() > deadline:
+                    raise IdempotencyKeyInUse
+                await asyncio.sleep(POLL_INTERVAL)
+        except RedisError:
+            logger.warning("Idempotency-Key lookup failed, running the request")
+            return await handler()
+
+        try:
+            response = await sync_to_async(self.replay)()
+            if response is None:
+                response = await handler()
+                await sync_to_async(self.save)(response)
+            return response
+        finally:
+            await sync_to_async(self.release)()
+
+    def acquire(self):
+        return bool(
+            self.client.set(self.lock_key, self.token, nx=True, ex=LOCK_TIMEOUT)
+        )
+
+    def release(self):
+        try:
+            self.client.register_script(RELEASE_SCRIPT)(
+                keys=[self.lock_key], args=[self.token]
+            )
+        except RedisError:
+            logger.warning("Releasing the Idempotency-Key lock failed")
+
+    def replay(self):
+        stored = self.client.hgetall(self.key)
+        if not stored:
+            return None
+        if stored[b"fingerprint"].decode() != self.fingerprint:
+            raise IdempotencyKeyReused
+        response = HttpResponse(stored[b"content"], status=int(stored[b"status"]))
+        for name, value in json.loads(stored[b"headers"]):
+            response[name] = value
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def save(self, response):
+        if not status.is_success(response.status_code) or response.streaming:
+            return
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.hset(
+                    self.key,
+                    mapping={
+                        "fingerprint": self.fingerprint,
+                        "status": response.status_code,
+                        "headers": json.dumps(list(response.items())),
+                        "content": response.content,
+                    },
+                )
+                pipe.expire(self.key, settings.IDEMPOTENCY_TTL)
+                pipe.execute()
+        except RedisError:
+            logger.warning("Storing the response of an Idempotency-Key failed")
+
+
+class IdempotentCreateMixin:
+    """
+    Makes `create()` idempotent for requests with an Idempotency-Key header, see
+    IdempotentRequest
+    """
+
+    def create(self, request, *args, **kwargs):
+        idempotent = IdempotentRequest.from_request(request)
+        if idempotent is None:
+            return super().create(request, *args, **kwargs)
+
+        def handler():
+            response = super(IdempotentCreateMixin, self).create(
+                request, *args, **kwargs
+            )
+            # Rendered here so the content can be stored
+            return self.finalize_response(request, response, *args, **kwargs).render()
+
+        response = idempotent.run(handler)
+        if response.get("Idempotent-Replayed"):
+            self.perform_replay(request)
+        return response
+
+    def perform_replay(self, request):
+        """
+        Runs instead of perform_create() when the response is replayed, for what the
+        stored response doesn't carry, like the cookies
+        """
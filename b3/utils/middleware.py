@@ -0,0 +1,269 @@
+import logging
+import re
+import time
+import zlib
+from collections import Counter
+from contextlib import ExitStack
+
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+# Event streams are left out, compressors hold back each event until they have more
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/(?!event-stream)"
+    r"|application/([\w.-]+\+)?(json|x-ndjson|javascript|xml)\b)"
+)
+
+
+class QueryStats:
+    """
+    Database wrapper counting the queries, their total time and how often each SQL
+    statement was run. Statements are compared before their parameters are bound so
+    `WHERE id = %s` in a loop shows up as one repeated statement.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def max_repeats(self):
+        if not self.statements:
+            return 0
+        return max(self.statements.values())
+
+
+class QueryBudgetMiddleware:
+    """
+    Reports the SQL queries of each request in a Server-Timing header and a log line
+
+    Requests running more than QUERY_BUDGET_MAX_QUERIES queries, or the same
+    statement QUERY_BUDGET_MAX_REPEATS times, are logged as warnings. Queries run
+    while a streaming response is consumed are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_queries = getattr(settings, "QUERY_BUDGET_MAX_QUERIES", 20)
+        self.max_repeats = getattr(settings, "QUERY_BUDGET_MAX_REPEATS", 5)
+        self.server_timing = getattr(settings, "QUERY_BUDGET_SERVER_TIMING", True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self.wrap_connections(stack, stats)
+            response = self.get_response(request)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        # The async ORM runs queries in the thread sync_to_async() uses for this
+        # request, so that is where the connections are wrapped
+        stats = QueryStats()
+        start = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    def wrap_connections(self, stack, stats):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+
+    def finish(self, request, response, stats, duration):
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                f"total;dur={duration * 1000:.1f}"
+            )
+        self.log(request, response, stats, duration)
+        return response
+
+    def log(self, request, response, stats, duration):
+        over_budget = (
+            stats.count > self.max_queries or stats.max_repeats >= self.max_repeats
+        )
+        level = logging.WARNING if over_budget else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+
+        extra = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 1),
+            "total_ms": round(duration * 1000, 1),
+            "max_repeats": stats.max_repeats,
+        }
+        if over_budget:
+            extra["repeated"] = [
+                {"sql": sql, "count": count}
+                for sql, count in stats.statements.most_common(3)
+                if count > 1
+            ]
+        logger.log(
+            level,
+            " ".join(f"{key}=%s" for key in extra),
+            *extra.values(),
+            extra={"query_budget": extra},
+        )
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(
+            getattr(settings, "COMPRESSION_GZIP_LEVEL", 6), zlib.DEFLATED, 31
+        )
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=getattr(settings, "COMPRESSION_BROTLI_QUALITY", 4)
+        )
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with brotli or gzip, whichever the client prefers in its
+    Accept-Encoding
+
+    Only text and JSON responses of at least COMPRESSION_MIN_LENGTH bytes are
+    compressed, except server-sent events. Streaming responses are compressed chunk
+    by chunk as they are sent, flushing the encoder after every chunk so the client
+    gets each one without waiting for the encoder's buffer to fill. Views decorated with utils.decorators.compress_exempt
+    are left alone, like small responses or ones that reflect secrets such as the
+    CSRF token (BREACH).
+
+    Like GZipMiddleware, strong ETags are made weak.
+    """
+
+    encoders = (BrotliEncoder, GzipEncoder)
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, "COMPRESSION_MIN_LENGTH", 1024)
+
+    def process_response(self, request, response):
+        if (
+            getattr(response, "compress_exempt", False)
+            or response.has_header("Content-Encoding")
+            or not COMPRESSIBLE_TYPES.match(response.get("Content-Type", ""))
+            or (not response.streaming and len(response.content) < self.min_length)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoder_class = self.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoder_class is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_sequence(
+                    encoder_class(), response.streaming_content
+                )
+            else:
+                response.streaming_content = self.compress_sequence(
+                    encoder_class(), response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            encoder = encoder_class()
+            content = encoder.compress(response.content) + encoder.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoder_class.name
+        return response
+
+    def negotiate(self, accept_encoding):
+        """
+        Returns the encoder with the highest q-value, ties going to the first one
+        """
+        qvalues = {}
+        for coding in accept_encoding.split(","):
+            name, _, params = coding.partition(";")
+            match = re.search(r"\bq=([\d.]+)", params)
+            try:
+                qvalues[name.strip().lower()] = float(match[1]) if match else 1.0
+            except ValueError:
+                continue
+
+        best, best_q = None, 0
+        for encoder_class in self.encoders:
+            q = qvalues.get(encoder_class.name, qvalues.get("*", 0))
+            if q > best_q:
+                best, best_q = encoder_class, q
+        return best
+
+    @staticmethod
+    def compress_sequence(encoder, sequence):
+        for chunk in sequence:
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+
+    @staticmethod
+    async def acompress_sequence(encoder, sequence):
+        async for chunk in sequence:
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
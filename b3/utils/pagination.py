@@ -0,0 +1,298 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import DateTimeField, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward only keyset (cursor) pagination
+
+    Each page continues strictly after the last row of the previous page, e.g.
+    `WHERE (created_at, id) < (%s, %s)`, instead of skipping rows with OFFSET. Deep
+    pages are therefore as cheap as the first one and no COUNT(*) is needed.
+
+    `ordering` must be unique across the queryset, hence the id tiebreaker.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = 1000
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.get_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.get_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the rows of the page plus one to tell if there is a next page
+        """
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        self.next_position = self.get_position(page[-1]) if self.has_next else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": f"http://api.example.org/accounts/?{self.cursor_query_param}=WyIyMDI1Il0=",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from `next`, empty for the first page.",
+                "schema": {"type": "string"},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor()
+        )
+
+    def get_position(self, row):
+        fields = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [str(row[field]) for field in fields]
+        return [str(getattr(row, field)) for field in fields]
+
+    def get_position_filter(self, position):
+        # (a, b) < (x, y) is expanded to a <= x AND (a < x OR (a = x AND b < y)). The
+        # leading bound on the first key lets Postgres start the index scan at the
+        # cursor instead of filtering from the top.
+        keys = list(zip(self.ordering, position))
+        condition = None
+        for field, value in reversed(keys):
+            name = field.lstrip("-")
+            operator = "lt" if field.startswith("-") else "gt"
+            beyond = Q(**{f"{name}__{operator}": value})
+            if condition is None:
+                condition = beyond
+            else:
+                condition = beyond | (Q(**{name: value}) & condition)
+
+        field, value = keys[0]
+        operator = "lte" if field.startswith("-") else "gte"
+        return Q(**{f"{field.lstrip('-')}__{operator}": value}) & condition
+
+    def encode_cursor(self):
+        data = json.dumps(self.next_position, separators=(",", ":"))
+        return urlsafe_b64encode(data.encode()).decode("ascii")
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            return self.to_position(queryset, position)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_position(self, queryset, position):
+        """
+        Converts a decoded position to the values of the ordering fields
+        """
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValueError
+        return [
+            self._get_field(queryset, field.lstrip("-")).to_python(value)
+            for field, value in zip(self.ordering, position)
+        ]
+
+    @staticmethod
+    def _get_field(queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+
+class RankedKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for querysets annotated with a `rank`, best first
+    """
+
+    ordering = ("-rank", "-id")
+
+
+class SyncPagination(KeysetPagination):
+    """
+    Keyset pagination of several querysets at once, oldest change first, for clients
+    catching up with what changed
+
+    The first page fixes `until`, the time up to which the changes are paged, and
+    each page has up to `page_size` rows of every queryset that has rows left. The
+    cursor carries `until` and the position in each of those querysets. Rows that
+    change while a client pages through move past `until`, to its next sync.
+    """
+
+    ordering = ("updated_at", "id")
+
+    def paginate_querysets(self, querysets, request):
+        """
+        Returns the pages of the querysets, a dict of them by name
+        """
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.is_first_page, self.until, positions = self.decode_cursor(
+            request, querysets
+        )
+
+        pages = {}
+        self.next_positions = {}
+        for name, queryset in querysets.items():
+            if name not in positions:
+                pages[name] = []
+                continue
+            queryset = queryset.filter(updated_at__lte=self.until).order_by(
+                *self.ordering
+            )
+            if positions[name] is not None:
+                queryset = queryset.filter(self.get_position_filter(positions[name]))
+            pages[name] = self.get_page(list(queryset[: self.page_size + 1]))
+            if self.has_next:
+                self.next_positions[name] = self.next_position
+        self.has_next = bool(self.next_positions)
+        return pages
+
+    def encode_cursor(self):
+        data = json.dumps(
+            {"until": self.until.isoformat(), "positions": self.next_positions},
+            separators=(",", ":"),
+        )
+        return urlsafe_b64encode(data.encode()).decode("ascii")
+
+    def decode_cursor(self, request, querysets):
+        """
+        Returns whether it's the first page, `until` and the position in each
+        queryset with rows left, None to start from its first row
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return True, timezone.now(), dict.fromkeys(querysets)
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            until = DateTimeField().to_python(cursor["until"])
+            if until is None:
+                raise ValueError
+            positions = {
+                name: self.to_position(querysets[name], position)
+                for name, position in cursor["positions"].items()
+            }
+            return False, until, positions
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class OptionalKeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination unless the client opts in to keyset pagination by sending
+    the `cursor` query parameter (empty for the first page).
+    """
+
+    keyset_pagination_class = KeysetPagination
+    # The view can set this when it has already counted the queryset
+    known_count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of paginate_queryset()
+        """
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = self.known_count
+        if self.count is None:
+            self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count == 0 or self.offset > self.count:
+            return []
+        start, stop = self.offset, self.offset + self.limit
+        return [row async for row in queryset[start:stop]]
+
+    def get_count(self, queryset):
+        if self.known_count is not None:
+            return self.known_count
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(
+            view
+        ) + self.keyset_pagination_class().get_schema_operation_parameters(view)
@@ -1,5 +1,77 @@
+import codecs
+
+import orjson
+from django.conf import settings
 from rest_framework import serializers
-from rest_framework.renderers import BrowsableAPIRenderer, HTMLFormRenderer
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import (
+    BrowsableAPIRenderer,
+    HTMLFormRenderer,
+    JSONRenderer,
+)
+
+# Like DRF's encoder: "Z" for UTC and str keys for any other dict key
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders the same compact JSON as DRF's JSONRenderer with orjson
+
+    orjson handles UUIDs, datetimes and dict/list/str subclasses natively; anything
+    else, like decimals and lazy strings, goes through DRF's encoder. Indented
+    output, non default JSON settings and values orjson can't encode, like integers
+    over 64 bits, are rendered by JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSONRenderer escapes the line and paragraph separators, which are valid
+        # JSON but not JavaScript
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON request bodies with orjson, which rejects NaN and Infinity like
+    JSONParser does with STRICT_JSON
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
 
 
 class CustomHTMLFormRenderer(HTMLFormRenderer):
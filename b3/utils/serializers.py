@@ -0,0 +1,101 @@
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from .pagination import KeysetPagination
+
+# Serializer fields whose to_representation() returns the value of the model field
+# they are mapped to as it is
+PASSTHROUGH_FIELDS = {
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+}
+
+
+class ValuesPlan:
+    """
+    Renders `.values()` rows like a ModelSerializer renders instances
+
+    Each row is a plain dict of the source columns, so no model instances or
+    serializers are created per row. Fields that need it still go through their
+    to_representation().
+    """
+
+    def __init__(self, fields):
+        # (output name, column, to_representation or None)
+        self.fields = fields
+        self.columns = tuple(column for _, column, _ in fields)
+
+    def values(self, queryset, paginator=None):
+        """
+        Returns the rows of the queryset with the plan's columns, and the ones keyset
+        pagination reads the position from
+        """
+        columns = list(self.columns)
+        keyset_pagination = paginator
+        if not isinstance(paginator, KeysetPagination):
+            keyset_pagination = getattr(paginator, "keyset_pagination_class", None)
+        if keyset_pagination is not None:
+            for field in keyset_pagination.ordering:
+                if field.lstrip("-") not in columns:
+                    columns.append(field.lstrip("-"))
+        return queryset.values(*columns)
+
+    def render(self, rows):
+        fields = self.fields
+        return [
+            {
+                name: (
+                    row[column]
+                    if convert is None or row[column] is None
+                    else convert(row[column])
+                )
+                for name, column, convert in fields
+            }
+            for row in rows
+        ]
+
+
+@functools.cache
+def get_values_plan(serializer_class):
+    """
+    Returns the ValuesPlan of a ModelSerializer, or None if a field can't be read
+    from a column, like nested serializers, method fields or dotted sources
+    """
+    model = serializer_class.Meta.model
+    fields = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if len(field.source_attrs) != 1 or isinstance(
+            field,
+            (
+                serializers.BaseSerializer,
+                serializers.RelatedField,
+                serializers.ManyRelatedField,
+            ),
+        ):
+            return None
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        column = model_field.attname
+        if model_field.is_relation:
+            model_field = model_field.target_field
+
+        natural_field = serializer_class.serializer_field_mapping.get(type(model_field))
+        if type(field) in PASSTHROUGH_FIELDS and natural_field is type(field):
+            convert = None
+        elif (
+            type(field) is serializers.UUIDField and field.uuid_format == "hex_verbose"
+        ):
+            convert = str
+        else:
+            convert = field.to_representation
+        fields.append((name, column, convert))
+    return ValuesPlan(tuple(fields))
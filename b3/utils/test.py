@@ -1,7 +1,10 @@
 import tempfile
+from contextlib import contextmanager
 
 from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django_otp import DEVICE_ID_SESSION_KEY
 from PIL import Image
 from rest_framework.fields import empty
@@ -79,6 +82,28 @@ class ViewTestCase(APITestCase):
     def _perm_repr(klass):
         return klass.__class__
 
+    @contextmanager
+    def assertMaxNumQueries(self, num, using=DEFAULT_DB_ALIAS):
+        """
+        Like assertNumQueries but only fails when more than `num` queries are run
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        self.assertLessEqual(
+            executed,
+            num,
+            "%d queries executed, at most %d expected\nCaptured queries were:\n%s"
+            % (
+                executed,
+                num,
+                "\n".join(
+                    f"{i}. {query['sql']}"
+                    for i, query in enumerate(context.captured_queries, start=1)
+                ),
+            ),
+        )
+
     def assertPermissions(self, expected, actions=DEFAULT_ACTIONS):
         view = self.view_class()
         expected_instances = [Klass() for Klass in expected]
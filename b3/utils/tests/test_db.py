@@ -0,0 +1,69 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from utils.db.postgresql import base
+
+
+class PooledDatabaseWrapperTests(SimpleTestCase):
+    def get_wrapper(self, pool=True, **settings):
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {**connection.settings_dict["OPTIONS"], "pool": pool},
+            **settings,
+        }
+        wrapper = base.DatabaseWrapper(settings_dict, alias="pooled")
+        self.addCleanup(wrapper.close_pool)
+        return wrapper
+
+    def get_backend_pid(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_connection_is_reused(self):
+        wrapper = self.get_wrapper({"min_size": 1, "max_size": 1})
+        pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(wrapper.pool.get_stats()["pool_available"], 1)
+        self.assertEqual(self.get_backend_pid(wrapper), pid)
+
+    def test_closed_in_transaction(self):
+        wrapper = self.get_wrapper({"min_size": 1, "max_size": 1})
+        wrapper.set_autocommit(False)
+        self.get_backend_pid(wrapper)
+        # Rolled back by the pool so the next user starts clean
+        with self.assertLogs("psycopg.pool", "WARNING"):
+            wrapper.close()
+        self.assertEqual(wrapper.pool.get_stats()["pool_available"], 1)
+        wrapper.set_autocommit(True)
+        self.get_backend_pid(wrapper)
+
+    def test_not_pooled(self):
+        wrapper = base.DatabaseWrapper(connection.settings_dict, alias="pooled")
+        self.assertIsNone(wrapper.pool)
+        self.get_backend_pid(wrapper)
+        wrapper.close()
+
+    def test_persistent_connections(self):
+        wrapper = base.DatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "CONN_MAX_AGE": 60,
+                "OPTIONS": {**connection.settings_dict["OPTIONS"], "pool": True},
+            },
+            alias="pooled",
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.pool
+
+    @override_settings(DB_POOL_STATS_INTERVAL=0)
+    def test_stats(self):
+        wrapper = self.get_wrapper()
+        with self.assertLogs(base.logger, "INFO") as logs:
+            self.get_backend_pid(wrapper)
+        [record] = logs.records
+        self.assertEqual(record.db_pool["name"], "pooled")
+        self.assertEqual(record.db_pool["requests_num"], 1)
@@ -0,0 +1,163 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import override_settings
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from task_lists import models
+from task_lists.tests import factories
+from users.models import User
+from users.tests.factories import UserFactory
+from utils import idempotency, throttling
+
+from .test_throttling import REDIS_CACHES
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class IdempotentCreateTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.list = factories.ListFactory(user=cls.user)
+        cls.url = reverse("task_list:list-list")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.addCleanup(self.delete_keys)
+
+    def delete_keys(self):
+        client = get_redis_connection()
+        for pattern in ("idempotency:*", "throttle:register-ip:*"):
+            for key in client.scan_iter(pattern):
+                client.delete(key)
+
+    def post(self, url, data, key="key-1"):
+        return self.client.post(url, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay(self):
+        response = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+        with self.assertNumQueries(0):
+            replayed = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(replayed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(replayed["Content-Type"], response["Content-Type"])
+        self.assertEqual(replayed.content, response.content)
+        self.assertEqual(models.List.objects.filter(name="groceries").count(), 1)
+
+        # Another key is another request
+        self.post(self.url, {"name": "groceries"}, key="key-2")
+        self.assertEqual(models.List.objects.filter(name="groceries").count(), 2)
+
+    def test_per_user(self):
+        self.post(self.url, {"name": "groceries"})
+        self.client.force_authenticate(UserFactory())
+        response = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_different_request(self):
+        self.post(self.url, {"name": "groceries"})
+        response = self.post(self.url, {"name": "chores"})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        task_url = reverse("task_list:task-list", kwargs={"pk": self.list.pk})
+        response = self.post(task_url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_errors_not_stored(self):
+        response = self.post(self.url, {"name": ""})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post(self.url, {"name": ""})
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_invalid_key(self):
+        response = self.post(self.url, {"name": "groceries"}, key="ünïcode")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Idempotency-Key", response.data)
+
+    @patch.object(idempotency, "WAIT_TIMEOUT", 0.1)
+    def test_in_progress(self):
+        get_redis_connection().set(f"idempotency:{self.user.pk}:key-1:lock", "other")
+        with self.assertNumQueries(0):
+            response = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_wait_for_request_in_progress(self):
+        client = get_redis_connection()
+        lock_key = f"idempotency:{self.user.pk}:key-1:lock"
+        client.set(lock_key, "other")
+        finished = []
+
+        def finish_other_request(seconds):
+            # The request holding the lock finishes while the retry waits for it
+            if not finished:
+                client.delete(lock_key)
+                finished.append(self.post(self.url, {"name": "groceries"}))
+
+        with patch.object(idempotency.time, "sleep", finish_other_request):
+            response = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(response.content, finished[0].content)
+        self.assertEqual(models.List.objects.filter(name="groceries").count(), 1)
+
+    def test_task_create(self):
+        url = reverse("task_list:task-list", kwargs={"pk": self.list.pk})
+        for _ in range(2):
+            response = self.post(url, {"name": "milk"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.list.task_set.count(), 1)
+
+    def register(self, csrf_cookie="csrf-1"):
+        self.client.logout()
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = csrf_cookie
+        data = {"email": "egwene@example.com", "password": "Amyrlin Seat 998"}
+        return self.post(reverse("users:register"), data)
+
+    def test_register(self):
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # The first response was lost, the retry logs the client in all the same
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        response = self.client.get(reverse("users:user-me"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "egwene@example.com")
+        self.assertEqual(User.objects.filter(email="egwene@example.com").count(), 1)
+
+    def test_register_per_client(self):
+        self.register()
+        # Another anonymous client with the same key runs its own request
+        response = self.register(csrf_cookie="csrf-2")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_register_without_csrf_cookie(self):
+        # Can't be told apart from other anonymous clients, the key is ignored
+        self.register(csrf_cookie="")
+        response = self.register(csrf_cookie="")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": "redis://localhost:1/0",
+            },
+        }
+    )
+    def test_redis_down(self):
+        with self.assertLogs(idempotency.logger, "WARNING"), self.assertLogs(
+            throttling.logger, "WARNING"
+        ):
+            response = self.post(self.url, {"name": "groceries"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
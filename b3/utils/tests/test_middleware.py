@@ -0,0 +1,175 @@
+import gzip
+import zlib
+
+import brotli
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from users.models import User
+from utils import middleware
+from utils.decorators import compress_exempt
+
+CONTENT = b'{"name": "' + b"task " * 500 + b'"}'
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def get_response(self, request):
+        User.objects.exists()
+        for pk in range(3):
+            User.objects.filter(pk=pk).exists()
+        return HttpResponse()
+
+    def get(self):
+        return middleware.QueryBudgetMiddleware(self.get_response)(
+            RequestFactory().get("/path/")
+        )
+
+    def test_server_timing(self):
+        response = self.get()
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="4 queries", total;dur=[\d.]+$',
+        )
+
+    @override_settings(QUERY_BUDGET_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        response = self.get()
+        self.assertNotIn("Server-Timing", response)
+
+    def get_logged(self, level):
+        with self.assertLogs(middleware.logger, level) as logs:
+            self.get()
+        [record] = logs.records
+        self.assertEqual(record.levelname, level)
+        return record.query_budget
+
+    def test_log(self):
+        stats = self.get_logged("INFO")
+        self.assertEqual(stats["path"], "/path/")
+        self.assertEqual(stats["status"], 200)
+        self.assertEqual(stats["queries"], 4)
+        self.assertEqual(stats["max_repeats"], 3)
+        self.assertNotIn("repeated", stats)
+
+    @override_settings(QUERY_BUDGET_MAX_REPEATS=3)
+    def test_log_repeated(self):
+        stats = self.get_logged("WARNING")
+        self.assertEqual(len(stats["repeated"]), 1)
+        self.assertEqual(stats["repeated"][0]["count"], 3)
+
+    @override_settings(QUERY_BUDGET_MAX_QUERIES=3)
+    def test_log_over_budget(self):
+        stats = self.get_logged("WARNING")
+        self.assertEqual(stats["queries"], 4)
+
+    async def test_async(self):
+        async def get_response(request):
+            await User.objects.aexists()
+            await User.objects.filter(pk=0).aexists()
+            return HttpResponse()
+
+        response = await middleware.QueryBudgetMiddleware(get_response)(
+            RequestFactory().get("/path/")
+        )
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def get(self, accept_encoding, get_response=None):
+        request = RequestFactory().get(
+            "/", headers={"Accept-Encoding": accept_encoding}
+        )
+        return middleware.CompressionMiddleware(get_response or self.get_response)(
+            request
+        )
+
+    def get_response(self, request):
+        response = HttpResponse(CONTENT, content_type="application/json")
+        response["ETag"] = '"etag"'
+        return response
+
+    def test_negotiation(self):
+        for accept_encoding, encoding in (
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("br;q=0, *", "gzip"),
+            ("*;q=0.1", "br"),
+            ("br;q=0, gzip;q=0", None),
+            ("identity", None),
+            ("", None),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get(accept_encoding)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_compressed(self):
+        response = self.get("br")
+        self.assertEqual(brotli.decompress(response.content), CONTENT)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["ETag"], 'W/"etag"')
+
+        response = self.get("gzip")
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    def test_not_compressed(self):
+        responses = {
+            "small": JsonResponse({"name": "task"}),
+            "image": HttpResponse(CONTENT, content_type="image/png"),
+            "event stream": StreamingHttpResponse(
+                iter([CONTENT]), content_type="text/event-stream"
+            ),
+            "exempt": compress_exempt(self.get_response)(None),
+        }
+        for name, response in responses.items():
+            with self.subTest(name):
+                response = self.get("br", lambda request: response)
+                self.assertNotIn("Content-Encoding", response)
+
+    def test_streaming(self):
+        decompressors = {
+            "br": lambda: brotli.Decompressor().process,
+            "gzip": lambda: zlib.decompressobj(31).decompress,
+        }
+        for encoding, decompressor in decompressors.items():
+            with self.subTest(encoding):
+                read = []
+
+                def content():
+                    for i in range(3):
+                        read.append(i)
+                        yield CONTENT
+
+                def get_response(request):
+                    return StreamingHttpResponse(
+                        content(), content_type="application/x-ndjson"
+                    )
+
+                response = self.get(encoding, get_response)
+                self.assertEqual(response["Content-Encoding"], encoding)
+                self.assertNotIn("Content-Length", response)
+                decompress = decompressor()
+                chunks = iter(response)
+                for i in range(3):
+                    # Each chunk is sent whole before the next one is read
+                    self.assertEqual(decompress(next(chunks)), CONTENT)
+                    self.assertEqual(read, list(range(i + 1)))
+                self.assertEqual(decompress(b"".join(chunks)), b"")
+
+    async def test_async_streaming(self):
+        async def content():
+            for _ in range(100):
+                yield CONTENT
+
+        async def get_response(request):
+            return StreamingHttpResponse(content(), content_type="text/csv")
+
+        response = await self.get("br", get_response)
+        self.assertEqual(response["Content-Encoding"], "br")
+        decompressor = brotli.Decompressor()
+        chunks = [chunk async for chunk in response]
+        for chunk in chunks[:100]:
+            self.assertEqual(decompressor.process(chunk), CONTENT)
+        self.assertEqual(b"".join(map(decompressor.process, chunks[100:])), b"")
+        self.assertTrue(decompressor.is_finished())
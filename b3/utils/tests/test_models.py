@@ -0,0 +1,45 @@
+import time
+import uuid
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from utils.models import UUID7_SQL, new_uuid, uuid7
+
+
+class UUID7Assertions:
+    def assertUUID7(self, value, before_ms, after_ms):
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertGreaterEqual(value.int >> 80, before_ms)
+        self.assertLessEqual(value.int >> 80, after_ms)
+
+
+class UUID7Tests(UUID7Assertions, SimpleTestCase):
+    def test_uuid7(self):
+        before_ms = time.time_ns() // 1_000_000
+        values = [uuid7() for _ in range(1000)]
+        after_ms = time.time_ns() // 1_000_000
+        for value in values:
+            self.assertUUID7(value, before_ms, after_ms)
+        self.assertEqual(len(set(values)), len(values))
+        self.assertEqual(sorted(values), values)
+        # As strings too, like the ones of URLs and JSON
+        self.assertEqual(sorted(map(str, values)), list(map(str, values)))
+
+    def test_new_uuid(self):
+        self.assertEqual(new_uuid().version, 4)
+        with override_settings(UUID7=True):
+            self.assertEqual(new_uuid().version, 7)
+
+
+class UUID7SQLTests(UUID7Assertions, TestCase):
+    def test_uuid7_sql(self):
+        before_ms = time.time_ns() // 1_000_000
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {UUID7_SQL} FROM generate_series(1, 100)")
+            values = [value for value, in cursor.fetchall()]
+        after_ms = time.time_ns() // 1_000_000
+        for value in values:
+            self.assertUUID7(value, before_ms, after_ms)
+        self.assertEqual(len(set(values)), len(values))
@@ -0,0 +1,84 @@
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from utils.renderers import ORJSONParser, ORJSONRenderer
+
+NOW = datetime.datetime(2024, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.UTC)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameJSON(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_wire_format(self):
+        self.assertSameJSON(
+            {
+                "count": 2,
+                "next": None,
+                "results": [
+                    {
+                        "id": uuid.uuid4(),
+                        "name": 'Quotes " and \\ ünïcode ✓    \x00',
+                        "completed": True,
+                        "created_at": NOW,
+                        "updated_at": NOW.replace(microsecond=0),
+                    },
+                    ReturnDict({"naive": NOW.replace(tzinfo=None)}, serializer=None),
+                ],
+                "offset": NOW.astimezone(
+                    datetime.timezone(datetime.timedelta(hours=2))
+                ),
+                "date": NOW.date(),
+                "time": NOW.time(),
+                1: 0.5,
+            }
+        )
+
+    def test_encoder_fallback(self):
+        self.assertSameJSON(
+            {
+                "decimal": decimal.Decimal("1.10"),
+                "lazy": gettext_lazy("Not found."),
+                "duration": datetime.timedelta(minutes=1),
+                "big": 2**70,
+            }
+        )
+        with self.assertRaises(TypeError):
+            ORJSONRenderer().render({"object": object()})
+
+    def test_indent(self):
+        self.assertSameJSON([{"a": 1}], "application/json; indent=4")
+        self.assertSameJSON([{"a": 1}], renderer_context={"indent": 2})
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, body, parser_context=None):
+        return ORJSONParser().parse(io.BytesIO(body), parser_context=parser_context)
+
+    def test_parse(self):
+        body = '{"name": "ünïcode ✓", "tasks": [1, 2.5, null, true]}'.encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body)))
+
+    def test_encoding(self):
+        body = '{"name": "ünïcode"}'.encode("utf-16")
+        self.assertEqual(self.parse(body, {"encoding": "utf-16"}), {"name": "ünïcode"})
+
+    def test_invalid(self):
+        for body in (b"{", b"[NaN]", b'"\xff"', b""):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(body)
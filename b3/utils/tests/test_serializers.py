@@ -0,0 +1,67 @@
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from task_lists import models
+from task_lists import serializers as task_list_serializers
+from task_lists.tests import factories
+from users.tests.factories import UserFactory
+from utils.serializers import get_values_plan
+
+
+class TimestampedTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Task
+        fields = ("id", "name", "created_at", "updated_at")
+
+
+class RelatedFieldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Task
+        fields = ("id", "list")
+
+
+class MethodFieldSerializer(serializers.ModelSerializer):
+    title = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Task
+        fields = ("id", "title")
+
+    def get_title(self, task):
+        return task.name.title()
+
+
+class ValuesPlanTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = UserFactory()
+        task_list = factories.ListFactory(user=user, name='Quotes " and \\ ünïcode ✓')
+        factories.TaskFactory(list=task_list, name="\u2028 line separator")
+        factories.TaskFactory(list=task_list, name="", description="")
+
+    def assertSameJSON(self, serializer_class, queryset):
+        plan = get_values_plan(serializer_class)
+        self.assertIsNotNone(plan)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(plan.render(plan.values(queryset))),
+            renderer.render(serializer_class(queryset, many=True).data),
+        )
+
+    def test_lists(self):
+        self.assertSameJSON(
+            task_list_serializers.ListSerializer, models.List.objects.order_by("pk")
+        )
+
+    def test_tasks(self):
+        queryset = models.Task.objects.order_by("pk")
+        self.assertSameJSON(task_list_serializers.TaskSerializer, queryset)
+        self.assertSameJSON(task_list_serializers.TaskCreateSerializer, queryset)
+
+    def test_converted_fields(self):
+        self.assertSameJSON(TimestampedTaskSerializer, models.Task.objects.all())
+
+    def test_unsupported_fields(self):
+        self.assertIsNone(get_values_plan(MethodFieldSerializer))
+        self.assertIsNone(get_values_plan(RelatedFieldSerializer))
@@ -0,0 +1,94 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django_redis import get_redis_connection
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from utils import throttling
+
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/2"),
+    },
+}
+RATES = {"test-ip": "3/m", "test-email": "1/h", "user": None}
+
+
+class TestIPThrottle(throttling.IPRateThrottle):
+    scope = "test-ip"
+
+
+class TestEmailThrottle(throttling.EmailRateThrottle):
+    scope = "test-email"
+
+
+@override_settings(
+    CACHES=REDIS_CACHES, REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": RATES}
+)
+class RedisRateThrottleTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(self.delete_keys)
+
+    def delete_keys(self):
+        client = get_redis_connection()
+        for key in client.scan_iter("throttle:test-*"):
+            client.delete(key)
+
+    def get_request(self, ip="10.0.0.1", data=None):
+        request = APIRequestFactory().post(
+            "/", data or {}, format="json", REMOTE_ADDR=ip
+        )
+        return Request(request, parsers=[JSONParser()])
+
+    def test_limit(self):
+        for _ in range(3):
+            self.assertTrue(TestIPThrottle().allow_request(self.get_request(), None))
+
+        throttle = TestIPThrottle()
+        self.assertFalse(throttle.allow_request(self.get_request(), None))
+        self.assertIn(throttle.wait(), (19, 20))
+
+        # Counted per IP
+        self.assertTrue(
+            TestIPThrottle().allow_request(self.get_request("10.0.0.2"), None)
+        )
+
+    def test_script_not_loaded(self):
+        get_redis_connection().script_flush()
+        self.assertTrue(TestIPThrottle().allow_request(self.get_request(), None))
+
+    def test_email(self):
+        throttle = TestEmailThrottle()
+        request = self.get_request(data={"email": "Nynaeve@example.com"})
+        self.assertTrue(throttle.allow_request(request, None))
+        request = self.get_request("10.0.0.2", {"email": "nynaeve@example.com "})
+        self.assertFalse(throttle.allow_request(request, None))
+        self.assertTrue(throttle.allow_request(self.get_request(), None))
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"test-ip": None}})
+    def test_disabled(self):
+        for _ in range(5):
+            self.assertTrue(TestIPThrottle().allow_request(self.get_request(), None))
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": "redis://localhost:1/0",
+            },
+        }
+    )
+    def test_redis_down(self):
+        with self.assertLogs(throttling.logger, "WARNING"):
+            self.assertTrue(TestIPThrottle().allow_request(self.get_request(), None))
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.RedisRateThrottle.parse_rate("10/15m"), (10, 900))
+        self.assertEqual(throttling.RedisRateThrottle.parse_rate("5/day"), (5, 86400))
+        self.assertEqual(throttling.RedisRateThrottle.parse_rate(None), (None, None))
+        with self.assertRaises(ImproperlyConfigured):
+            throttling.RedisRateThrottle.parse_rate("often")
@@ -1,6 +1,21 @@
+import hashlib
+import json
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views.decorators.csrf import csrf_protect
+from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import get_values_plan
 
 
 class CSRFProtectMixin:
@@ -18,3 +33,168 @@ class CSRFProtectMixin:
     @method_decorator(csrf_protect)
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource has been modified."
+    default_code = "precondition_failed"
+
+
+class ResponseValidatorsMixin:
+    """
+    ETag and Last-Modified for collections and objects with an `updated_at`
+    """
+
+    def get_collection_etag(self, last_updated, count):
+        value = f"{last_updated.isoformat() if last_updated else ''}:{count}"
+        return f'W/"{hashlib.md5(value.encode()).hexdigest()}"'
+
+    def get_page_etag(self, cursor, data):
+        value = f"{cursor}:{json.dumps(data, cls=JSONEncoder)}"
+        return f'W/"{hashlib.md5(value.encode()).hexdigest()}"'
+
+    def get_keyset_cursor(self, paginator):
+        """
+        The cursor of a keyset page request, or None
+        """
+        keyset_pagination = getattr(paginator, "keyset_pagination_class", None)
+        if keyset_pagination is None:
+            return None
+        return self.request.query_params.get(keyset_pagination.cursor_query_param)
+
+    def get_object_validators(self, instance):
+        value = f"{instance.pk}:{instance.updated_at.isoformat()}"
+        etag = f'"{hashlib.md5(value.encode()).hexdigest()}"'
+        return etag, int(instance.updated_at.timestamp())
+
+    def set_validators(self, response, etag, last_modified=None):
+        if response.status_code >= 400:
+            return response
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # The responses are per user and must be revalidated before they are reused
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def has_preconditions(self):
+        meta = self.request.META
+        return "HTTP_IF_MATCH" in meta or "HTTP_IF_UNMODIFIED_SINCE" in meta
+
+    def check_preconditions(self, instance):
+        etag, last_modified = self.get_object_validators(instance)
+        # CompressionMiddleware weakens the ETag of compressed responses, which still
+        # identifies the same version of the object
+        meta = self.request.META
+        if "HTTP_IF_MATCH" in meta:
+            meta["HTTP_IF_MATCH"] = meta["HTTP_IF_MATCH"].replace('W/"', '"')
+        if get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        ):
+            raise PreconditionFailed
+
+
+class ValuesListMixin:
+    """
+    Lists `.values()` rows rendered by the serializer's ValuesPlan, for serializers
+    that have one, see utils.serializers
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = get_values_plan(self.get_serializer_class())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = plan.values(self.filter_queryset(self.get_queryset()), self.paginator)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
+
+
+class ConditionalRequestMixin(ResponseValidatorsMixin):
+    """
+    Adds validators to GET responses and answers If-None-Match with 304 Not Modified
+
+    Collections get a weak ETag from the max `updated_at` and the row count of the
+    filtered queryset, read in one aggregate query. Keyset pages skip the aggregate,
+    which would scan the whole collection for every page, and get one from the
+    cursor and the page itself once it's read. Objects get a strong ETag and a
+    Last-Modified from their `updated_at`. Updates and deletes with If-Match or
+    If-Unmodified-Since lock the row and fail with 412 if it has changed.
+    """
+
+    lock_object = False
+
+    def list(self, request, *args, **kwargs):
+        cursor = self.get_keyset_cursor(self.paginator)
+        if cursor is not None:
+            response = super().list(request, *args, **kwargs)
+            etag = self.get_page_etag(cursor, response.data)
+            response = get_conditional_response(request, etag=etag) or response
+            return self.set_validators(response, etag)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(
+            last_updated=Max("updated_at"), count=Count("pk")
+        )
+        etag = self.get_collection_etag(state["last_updated"], state["count"])
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if self.paginator is not None:
+                self.paginator.known_count = state["count"]
+            response = super().list(request, *args, **kwargs)
+        return self.set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self.set_validators(response, etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        with self.lock_for_preconditions():
+            response = super().update(request, *args, **kwargs)
+        return self.set_validators(response, *self.get_object_validators(self.object))
+
+    def destroy(self, request, *args, **kwargs):
+        with self.lock_for_preconditions():
+            return super().destroy(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.lock_object:
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_object(self):
+        # Also keeps the object around so the retrieve and update responses don't
+        # fetch it again
+        self.object = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            self.check_preconditions(self.object)
+        return self.object
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.object = serializer.instance
+
+    @contextmanager
+    def lock_for_preconditions(self):
+        if not self.has_preconditions():
+            yield
+            return
+
+        with transaction.atomic():
+            self.lock_object = True
+            try:
+                yield
+            finally:
+                self.lock_object = False
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class VersionsConfig(AppConfig):
     name = "versions"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.core.cache import cache, caches
+
+from . import models
+
+LATEST_VERSION_KEY = "versions:latest"
+LATEST_VERSION_TIMEOUT = 60 * 60 * 24
+# Processes only see an invalidation once their local copy expires
+LATEST_VERSION_LOCAL_TIMEOUT = 5
+
+
+def get_latest_version():
+    """
+    Returns the latest Version, or None if there is none
+
+    Read from the per-process cache, then Redis, then the database. Saving or
+    deleting a Version clears the cached copies, see signals.py.
+    """
+    local_cache = caches["local"]
+    entry = local_cache.get(LATEST_VERSION_KEY)
+    if entry is None:
+        entry = cache.get(LATEST_VERSION_KEY)
+        if entry is None:
+            entry = {"version": _fetch_latest_version()}
+            cache.set(LATEST_VERSION_KEY, entry, LATEST_VERSION_TIMEOUT)
+        local_cache.set(LATEST_VERSION_KEY, entry, LATEST_VERSION_LOCAL_TIMEOUT)
+    return entry["version"]
+
+
+def invalidate_latest_version():
+    cache.delete(LATEST_VERSION_KEY)
+    caches["local"].delete(LATEST_VERSION_KEY)
+
+
+def get_etag(version):
+    digest = hashlib.md5(
+        f"{version.pk}:{version.updated_at.isoformat()}".encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _fetch_latest_version():
+    try:
+        return models.Version.objects.latest("created_at")
+    except models.Version.DoesNotExist:
+        return None
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("versions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="version",
+            name="id",
+            field=models.UUIDField(
+                default=utils.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
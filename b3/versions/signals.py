@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache, models
+
+
+@receiver((post_save, post_delete), sender=models.Version)
+def invalidate_latest_version(sender, **kwargs):
+    # Again after the commit, a request could have cached the old row in between
+    cache.invalidate_latest_version()
+    transaction.on_commit(cache.invalidate_latest_version)
@@ -1,10 +1,19 @@
+from django.conf import settings
+from django.test import override_settings
+from django_redis import get_redis_connection
 from rest_framework import status
 from rest_framework.reverse import reverse
 
 from utils.test import ViewTestCase
+from utils.tests.test_throttling import REDIS_CACHES
 
 from . import factories
 
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
 
 class VersionViewTests(ViewTestCase):
     @classmethod
@@ -26,3 +35,73 @@ class VersionViewTests(ViewTestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["minimum_version"], "1.1.0")
+
+    def test_cache_headers(self):
+        factories.VersionFactory(minimum_version="1.0.0")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("ETag", response)
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        factories.VersionFactory(minimum_version="1.1.0")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["minimum_version"], "1.1.0")
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_cached(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        version = factories.VersionFactory(minimum_version="1.0.0")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["minimum_version"], "1.0.0")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["minimum_version"], "1.0.0")
+
+        version.minimum_version = "1.0.1"
+        with self.captureOnCommitCallbacks(execute=True):
+            version.save()
+            # A request before the commit caches the row it sees
+            self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["minimum_version"], "1.0.1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            version.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(
+        CACHES={**LOCMEM_CACHES, **REDIS_CACHES},
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"user": "1/m"},
+        },
+    )
+    def test_not_throttled(self):
+        self.addCleanup(get_redis_connection().delete, "throttle:user:127.0.0.1")
+        factories.VersionFactory(minimum_version="1.0.0")
+        for _ in range(3):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
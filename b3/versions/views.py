@@ -1,17 +1,42 @@
 from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
-from . import models, serializers
+from utils.decorators import compress_exempt
 
+from . import cache, serializers
 
+
+@method_decorator(cache_control(public=True, max_age=60), name="dispatch")
+@method_decorator(compress_exempt, name="dispatch")
 class VersionsView(generics.RetrieveAPIView):
     serializer_class = serializers.VersionSerializer
     authentication_classes = ()
     permission_classes = (AllowAny,)
+    # Cached and cheap, not worth a Redis round trip per request
+    throttle_classes = ()
 
     def get_object(self):
-        try:
-            return models.Version.objects.latest("created_at")
-        except models.Version.DoesNotExist:
+        version = cache.get_latest_version()
+        if version is None:
             raise Http404
+        return version
+
+    def retrieve(self, request, *args, **kwargs):
+        version = self.get_object()
+        etag = cache.get_etag(version)
+        last_modified = int(version.updated_at.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(version).data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response